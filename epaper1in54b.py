@@ -28,8 +28,8 @@ SOFTWARE.
 # also works for black/white/yellow GDEW0154C39?
 
 from micropython import const
-from time import sleep_ms
-import ustruct
+from epdif import EPDIF, WAIT_IDLE, REFRESH
+from epdpaint import Paint
 
 # Display resolution
 EPD_WIDTH  = const(200)
@@ -83,20 +83,42 @@ ROTATE_270 = const(3)
 
 BUSY = const(0)  # 0=busy, 1=idle
 
-class EPD:
+# init sequence: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+INIT_SEQUENCE = (
+    b'\x01\x04\x07\x00\x08\x00' # POWER_SETTING
+    b'\x06\x03\x07\x07\x07'     # BOOSTER_SOFT_START
+    b'\x04\x80'                 # POWER_ON, then wait until idle
+    b'\x00\x01\xCF'             # PANEL_SETTING
+    b'\x50\x01\x17'             # VCOM_AND_DATA_INTERVAL_SETTING: for this panel, must be 0x17
+    b'\x30\x01\x39'             # PLL_CONTROL
+    b'\x61\x03\xC8\x00\xC8'     # TCON_RESOLUTION
+    b'\x82\x01\x0E'             # VCM_DC_SETTING_REGISTER: -1.4V
+)
+
+# 1bpp to 2bpp lookup for the black plane, 2 output bytes per input byte
+# each bit is doubled: bit set: 0b11, bit reset: 0b00
+def _expand_table():
+    table = bytearray(512)
+    for i in range(256):
+        word = 0
+        for bit in range(8):
+            if (i & (0x80 >> bit)):
+                word |= 0xC000 >> (bit * 2)
+        table[i * 2] = word >> 8
+        table[i * 2 + 1] = word & 0xFF
+    return table
+
+EXPAND = _expand_table()
+
+class EPD(EPDIF, Paint):
+    COLORED = 0 # bit value of a black or red pixel in either plane
+
     def __init__(self, spi, cs, dc, rst, busy):
-        self.spi = spi
-        self.cs = cs
-        self.dc = dc
-        self.rst = rst
-        self.busy = busy
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
-        self.rst.init(self.rst.OUT, value=0)
-        self.busy.init(self.busy.IN)
+        super().__init__(spi, cs, dc, rst, busy, BUSY)
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
         self.rotate = ROTATE_0
+        self._row = bytearray(EPD_WIDTH // 4) # one expanded black row, 2bpp
 
     LUT_VCOM0 = bytearray(b'\x0E\x14\x01\x0A\x06\x04\x0A\x0A\x0F\x03\x03\x0C\x06\x0A\x00')
     LUT_W     = bytearray(b'\x0E\x14\x01\x0A\x46\x04\x8A\x4A\x0F\x83\x43\x0C\x86\x0A\x04')
@@ -107,44 +129,12 @@ class EPD:
     LUT_RED0  = bytearray(b'\x83\x5D\x01\x81\x48\x23\x77\x77\x01\x00\x00\x00\x00\x00\x00')
     LUT_RED1  = LUT_VCOM1
 
-    def _command(self, command, data=None):
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        if data is not None:
-            self._data(data)
-
-    def _data(self, data):
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
-
-    def init(self):
-        self.reset()
-        self._command(POWER_SETTING, b'\x07\x00\x08\x00')
-        self._command(BOOSTER_SOFT_START, b'\x07\x07\x07')
-        self._command(POWER_ON)
-        self.wait_until_idle()
-        self._command(PANEL_SETTING, b'\xCF')
-        self._command(VCOM_AND_DATA_INTERVAL_SETTING, b'\x17') # for this panel, must be 0x17
-        self._command(PLL_CONTROL, b'\x39')
-        self._command(TCON_RESOLUTION, ustruct.pack(">BH", EPD_WIDTH, EPD_HEIGHT))
-        self._command(VCM_DC_SETTING_REGISTER, b'\x0E') # -1.4V
+    def _init(self):
+        yield from self._reset()
+        yield from self._script(INIT_SEQUENCE)
         self.set_lut_bw()
         self.set_lut_red()
 
-    def wait_until_idle(self):
-        while self.busy.value() == BUSY:
-            sleep_ms(100)
-
-    def reset(self):
-        self.rst(0)
-        sleep_ms(200)
-        self.rst(1)
-        sleep_ms(200)
-
     def set_lut_bw(self):
         self._command(VCOM_LUT, self.LUT_VCOM0) # vcom
         self._command(W2W_LUT, self.LUT_W)      # ww --
@@ -157,192 +147,50 @@ class EPD:
         self._command(LUT_RED_1, self.LUT_RED0)
         self._command(LUT_RED_2, self.LUT_RED1)
 
-    def display_frame(self, frame_buffer_black, frame_buffer_red):
+    # expand one row of the 1bpp black plane starting at offset into the 2bpp row buffer
+    def _expand_row(self, frame_buffer_black, offset):
+        row = self._row
+        lut = EXPAND
+        j = 0
+        for i in range(offset, offset + len(row) // 2):
+            k = frame_buffer_black[i] << 1
+            row[j] = lut[k]
+            row[j + 1] = lut[k + 1]
+            j += 2
+        return row
+
+    def _display_frame(self, frame_buffer_black, frame_buffer_red):
+        # check both planes before anything is sent
+        if (frame_buffer_black != None):
+            black, rows = self._rows(self._rotated(frame_buffer_black), EPD_WIDTH // 8, EPD_HEIGHT)
+        red = self._rotated(frame_buffer_red)
+        self._check(red, EPD_WIDTH * EPD_HEIGHT // 8)
         if (frame_buffer_black != None):
             self._command(DATA_START_TRANSMISSION_1)
-            sleep_ms(2)
-            for i in range(0, self.width * self.height // 8):
-                temp = 0x00
-                for bit in range(0, 4):
-                    if (frame_buffer_black[i] & (0x80 >> bit) != 0):
-                        temp |= 0xC0 >> (bit * 2)
-                self._data(bytearray([temp]))
-                temp = 0x00
-                for bit in range(4, 8):
-                    if (frame_buffer_black[i] & (0x80 >> bit) != 0):
-                        temp |= 0xC0 >> ((bit - 4) * 2)
-                self._data(bytearray([temp]))
-            sleep_ms(2)
+            yield 2
+            for offset in rows:
+                self._data(self._expand_row(black, offset))
+                yield 0
+            yield 2
         if (frame_buffer_red != None):
             self._command(DATA_START_TRANSMISSION_2)
-            sleep_ms(2)
-            for i in range(0, self.width * self.height // 8):
-                self._data(bytearray([frame_buffer_red[i]]))
-            sleep_ms(2)
+            yield 2
+            yield from self._send(red, EPD_WIDTH * EPD_HEIGHT // 8)
+            yield 2
 
         self._command(DISPLAY_REFRESH)
-        self.wait_until_idle()
-
-    def set_rotate(self, rotate):
-        if (rotate == ROTATE_0):
-            self.rotate = ROTATE_0
-            self.width = EPD_WIDTH
-            self.height = EPD_HEIGHT
-        elif (rotate == ROTATE_90):
-            self.rotate = ROTATE_90
-            self.width = EPD_HEIGHT
-            self.height = EPD_WIDTH
-        elif (rotate == ROTATE_180):
-            self.rotate = ROTATE_180
-            self.width = EPD_WIDTH
-            self.height = EPD_HEIGHT
-        elif (rotate == ROTATE_270):
-            self.rotate = ROTATE_270
-            self.width = EPD_HEIGHT
-            self.height = EPD_WIDTH
-
-    def set_pixel(self, frame_buffer, x, y, colored):
-        if (x < 0 or x >= self.width or y < 0 or y >= self.height):
-            return
-        if (self.rotate == ROTATE_0):
-            self.set_absolute_pixel(frame_buffer, x, y, colored)
-        elif (self.rotate == ROTATE_90):
-            point_temp = x
-            x = EPD_WIDTH - y
-            y = point_temp
-            self.set_absolute_pixel(frame_buffer, x, y, colored)
-        elif (self.rotate == ROTATE_180):
-            x = EPD_WIDTH - x
-            y = EPD_HEIGHT- y
-            self.set_absolute_pixel(frame_buffer, x, y, colored)
-        elif (self.rotate == ROTATE_270):
-            point_temp = x
-            x = y
-            y = EPD_HEIGHT - point_temp
-            self.set_absolute_pixel(frame_buffer, x, y, colored)
-
-    def set_absolute_pixel(self, frame_buffer, x, y, colored):
-        # To avoid display orientation effects
-        # use EPD_WIDTH instead of self.width
-        # use EPD_HEIGHT instead of self.height
-        if (x < 0 or x >= EPD_WIDTH or y < 0 or y >= EPD_HEIGHT):
-            return
-        if (colored):
-            frame_buffer[(x + y * EPD_WIDTH) // 8] &= ~(0x80 >> (x % 8))
-        else:
-            frame_buffer[(x + y * EPD_WIDTH) // 8] |= 0x80 >> (x % 8)
-
-    def display_string_at(self, frame_buffer, x, y, text, font, colored):
-        image = Image.new('1', (self.width, self.height))
-        draw = ImageDraw.Draw(image)
-        draw.text((x, y), text, font = font, fill = 255)
-        # Set buffer to value of Python Imaging Library image.
-        # Image must be in mode 1.
-        pixels = image.load()
-        for y in range(self.height):
-            for x in range(self.width):
-                # Set the bits for the column of pixels at the current position.
-                if pixels[x, y] != 0:
-                    self.set_pixel(frame_buffer, x, y, colored)
-
-    def draw_line(self, frame_buffer, x0, y0, x1, y1, colored):
-        # Bresenham algorithm
-        dx = abs(x1 - x0)
-        sx = 1 if x0 < x1 else -1
-        dy = -abs(y1 - y0)
-        sy = 1 if y0 < y1 else -1
-        err = dx + dy
-        while((x0 != x1) and (y0 != y1)):
-            self.set_pixel(frame_buffer, x0, y0 , colored)
-            if (2 * err >= dy):
-                err += dy
-                x0 += sx
-            if (2 * err <= dx):
-                err += dx
-                y0 += sy
-
-    def draw_horizontal_line(self, frame_buffer, x, y, width, colored):
-        for i in range(x, x + width):
-            self.set_pixel(frame_buffer, i, y, colored)
-
-    def draw_vertical_line(self, frame_buffer, x, y, height, colored):
-        for i in range(y, y + height):
-            self.set_pixel(frame_buffer, x, i, colored)
-
-    def draw_rectangle(self, frame_buffer, x0, y0, x1, y1, colored):
-        min_x = x0 if x1 > x0 else x1
-        max_x = x1 if x1 > x0 else x0
-        min_y = y0 if y1 > y0 else y1
-        max_y = y1 if y1 > y0 else y0
-        self.draw_horizontal_line(frame_buffer, min_x, min_y, max_x - min_x + 1, colored)
-        self.draw_horizontal_line(frame_buffer, min_x, max_y, max_x - min_x + 1, colored)
-        self.draw_vertical_line(frame_buffer, min_x, min_y, max_y - min_y + 1, colored)
-        self.draw_vertical_line(frame_buffer, max_x, min_y, max_y - min_y + 1, colored)
-
-    def draw_filled_rectangle(self, frame_buffer, x0, y0, x1, y1, colored):
-        min_x = x0 if x1 > x0 else x1
-        max_x = x1 if x1 > x0 else x0
-        min_y = y0 if y1 > y0 else y1
-        max_y = y1 if y1 > y0 else y0
-        for i in range(min_x, max_x + 1):
-            self.draw_vertical_line(frame_buffer, i, min_y, max_y - min_y + 1, colored)
 
-    def draw_circle(self, frame_buffer, x, y, radius, colored):
-        # Bresenham algorithm
-        x_pos = -radius
-        y_pos = 0
-        err = 2 - 2 * radius
-        if (x >= self.width or y >= self.height):
-            return
-        while True:
-            self.set_pixel(frame_buffer, x - x_pos, y + y_pos, colored)
-            self.set_pixel(frame_buffer, x + x_pos, y + y_pos, colored)
-            self.set_pixel(frame_buffer, x + x_pos, y - y_pos, colored)
-            self.set_pixel(frame_buffer, x - x_pos, y - y_pos, colored)
-            e2 = err
-            if (e2 <= y_pos):
-                y_pos += 1
-                err += y_pos * 2 + 1
-                if(-x_pos == y_pos and e2 <= x_pos):
-                    e2 = 0
-            if (e2 > x_pos):
-                x_pos += 1
-                err += x_pos * 2 + 1
-            if x_pos > 0:
-                break
+        yield REFRESH
+        yield WAIT_IDLE
 
-    def draw_filled_circle(self, frame_buffer, x, y, radius, colored):
-        # Bresenham algorithm
-        x_pos = -radius
-        y_pos = 0
-        err = 2 - 2 * radius
-        if (x >= self.width or y >= self.height):
-            return
-        while True:
-            self.set_pixel(frame_buffer, x - x_pos, y + y_pos, colored)
-            self.set_pixel(frame_buffer, x + x_pos, y + y_pos, colored)
-            self.set_pixel(frame_buffer, x + x_pos, y - y_pos, colored)
-            self.set_pixel(frame_buffer, x - x_pos, y - y_pos, colored)
-            self.draw_horizontal_line(frame_buffer, x + x_pos, y + y_pos, 2 * (-x_pos) + 1, colored)
-            self.draw_horizontal_line(frame_buffer, x + x_pos, y - y_pos, 2 * (-x_pos) + 1, colored)
-            e2 = err
-            if (e2 <= y_pos):
-                y_pos += 1
-                err += y_pos * 2 + 1
-                if(-x_pos == y_pos and e2 <= x_pos):
-                    e2 = 0
-            if (e2 > x_pos):
-                x_pos  += 1
-                err += x_pos * 2 + 1
-            if x_pos > 0:
-                break
+    display_string_at = Paint.draw_string_at
 
     # to wake call reset() or init()
-    def sleep(self):
+    def _sleep(self):
         # TODO do we need to reset these here?
         self._command(VCOM_AND_DATA_INTERVAL_SETTING, b'\x17') # for this panel, must be 0x17
         self._command(VCM_DC_SETTING_REGISTER, b'\x00') # to solve Vcom drop
         self._command(POWER_SETTING, b'\x02\x00\x00\x00') # gate switch to external
         # /TODO
-        self.wait_until_idle()
+        yield WAIT_IDLE
         self._command(POWER_OFF)
@@ -26,8 +26,7 @@ SOFTWARE.
 """
 
 from micropython import const
-from time import sleep_ms
-import ustruct
+from epdif import EPDIF, WAIT_IDLE, REFRESH, FILL_CHUNK
 
 # Display resolution
 EPD_WIDTH  = const(128)
@@ -63,65 +62,73 @@ TERMINATE_FRAME_READ_WRITE           = const(0xFF) # not in datasheet, aka NOOP
 
 BUSY = const(1)  # 1=busy, 0=idle
 
-class EPD:
-    def __init__(self, spi, cs, dc, rst, busy):
-        self.spi = spi
-        self.cs = cs
-        self.dc = dc
-        self.rst = rst
-        self.busy = busy
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
-        self.rst.init(self.rst.OUT, value=0)
-        self.busy.init(self.busy.IN)
+# init sequence: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+INIT_SEQUENCE = (
+    b'\x01\x03\xF9\x00\x00' # DRIVER_OUTPUT_CONTROL: GD = 0 SM = 0 TB = 0
+    b'\x0C\x03\xD7\xD6\x9D' # BOOSTER_SOFT_START_CONTROL
+    b'\x2C\x01\xA8'         # WRITE_VCOM_REGISTER: VCOM 7C
+    b'\x3A\x01\x1A'         # SET_DUMMY_LINE_PERIOD: 4 dummy lines per gate
+    b'\x3B\x01\x08'         # SET_GATE_TIME: 2us per line
+    b'\x11\x01\x03'         # DATA_ENTRY_MODE_SETTING: X increment Y increment
+)
+
+class EPD(EPDIF):
+    def __init__(self, spi, cs, dc, rst, busy, fill_chunk=FILL_CHUNK):
+        super().__init__(spi, cs, dc, rst, busy, BUSY, fill_chunk)
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
+        self._lut = None # last lut written, partial updates only upload theirs when it changes
 
     LUT_FULL_UPDATE    = bytearray(b'\x22\x55\xAA\x55\xAA\x55\xAA\x11\x00\x00\x00\x00\x00\x00\x00\x00\x1E\x1E\x1E\x1E\x1E\x1E\x1E\x1E\x01\x00\x00\x00\x00\x00')
     LUT_PARTIAL_UPDATE = bytearray(b'\x18\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x0F\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00')
 
-    def _command(self, command, data=None):
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        if data is not None:
-            self._data(data)
-
-    def _data(self, data):
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
-
-    def init(self):
-        self.reset()
-        self._command(DRIVER_OUTPUT_CONTROL)
-        self._data(bytearray([(EPD_HEIGHT - 1) & 0xFF]))
-        self._data(bytearray([((EPD_HEIGHT - 1) >> 8) & 0xFF]))
-        self._data(bytearray([0x00])) # GD = 0 SM = 0 TB = 0
-        self._command(BOOSTER_SOFT_START_CONTROL, b'\xD7\xD6\x9D')
-        self._command(WRITE_VCOM_REGISTER, b'\xA8') # VCOM 7C
-        self._command(SET_DUMMY_LINE_PERIOD, b'\x1A') # 4 dummy lines per gate
-        self._command(SET_GATE_TIME, b'\x08') # 2us per line
-        self._command(DATA_ENTRY_MODE_SETTING, b'\x03') # X increment Y increment
+    def _init(self):
+        yield from self._reset()
+        yield from self._script(INIT_SEQUENCE)
         self.set_lut(self.LUT_FULL_UPDATE)
 
-    def wait_until_idle(self):
-        while self.busy.value() == BUSY:
-            sleep_ms(100)
-
-    def reset(self):
-        self.rst(0)
-        sleep_ms(200)
-        self.rst(1)
-        sleep_ms(200)
-
     def set_lut(self, lut):
         self._command(WRITE_LUT_REGISTER, lut)
+        self._lut = lut
+
+    # the lut last written, LUT_FULL_UPDATE after init(), None before
+    @property
+    def lut(self):
+        return self._lut
 
     # put an image in the frame memory
+    # image is a buffer or an iterable of byte chunks, holding the window's rows of w // 8 bytes
     def set_frame_memory(self, image, x, y, w, h):
+        self._run(self._set_frame_memory(image, x, y, w, h))
+
+    async def set_frame_memory_async(self, image, x, y, w, h):
+        await self._run_async(self._set_frame_memory(image, x, y, w, h))
+
+    def _set_frame_memory(self, image, x, y, w, h):
+        # x point must be the multiple of 8 or the last 3 bits will be ignored
+        x = x & 0xF8
+        w = w & 0xF8
+
+        if (x + w >= self.width):
+            x_end = self.width - 1
+        else:
+            x_end = x + w - 1
+
+        if (y + h >= self.height):
+            y_end = self.height - 1
+        else:
+            y_end = y + h - 1
+
+        size = ((x_end >> 3) - (x >> 3) + 1) * (y_end - y + 1)
+        self._check(image, size)
+        self.set_memory_area(x, y, x_end, y_end)
+        yield from self._set_memory_pointer(x, y)
+        self._command(WRITE_RAM)
+        yield from self._send(image, size)
+
+    # fill an area of the frame memory with the specified color
+    # color is a byte (0xFF white, 0x00 black) or a repeating byte pattern
+    def fill_frame_memory(self, color, x, y, w, h):
         # x point must be the multiple of 8 or the last 3 bits will be ignored
         x = x & 0xF8
         w = w & 0xF8
@@ -138,41 +145,68 @@ class EPD:
 
         self.set_memory_area(x, y, x_end, y_end)
         self.set_memory_pointer(x, y)
-        self._command(WRITE_RAM, image)
+        self._command(WRITE_RAM)
+        self._fill(color, ((x_end >> 3) - (x >> 3) + 1) * (y_end - y + 1))
 
     # replace the frame memory with the specified color
     def clear_frame_memory(self, color):
-        self.set_memory_area(0, 0, self.width - 1, self.height - 1)
-        self.set_memory_pointer(0, 0)
-        self._command(WRITE_RAM)
-        # send the color data
-        for i in range(0, self.width // 8 * self.height):
-            self._data(bytearray([color]))
+        self.fill_frame_memory(color, 0, 0, self.width, self.height)
 
     # draw the current frame memory and switch to the next memory area
-    def display_frame(self):
+    def _display_frame(self):
         self._command(DISPLAY_UPDATE_CONTROL_2, b'\xC4')
         self._command(MASTER_ACTIVATION)
         self._command(TERMINATE_FRAME_READ_WRITE)
-        self.wait_until_idle()
+        yield REFRESH
+        yield WAIT_IDLE
+
+    # refresh from whatever set_frame_memory left in the frame memory, as display_frame()
+    # for callers that write the frame memory themselves, such as RefreshScheduler
+    def refresh(self):
+        self._run(self._display_frame())
+
+    async def refresh_async(self):
+        await self._run_async(self._display_frame())
+
+    # partial refresh of one window, image holds its w x h pixels in rows of w // 8 bytes
+    # x and w must be multiples of 8, as with set_frame_memory
+    # call init() or set_lut(self.LUT_FULL_UPDATE) to go back to full refreshes
+    def display_partial(self, image, x, y, w, h):
+        self._run(self._display_partial(image, x, y, w, h))
+
+    async def display_partial_async(self, image, x, y, w, h):
+        await self._run_async(self._display_partial(image, x, y, w, h))
+
+    def _display_partial(self, image, x, y, w, h):
+        # the window is written twice, and an iterable of chunks would be used up by the first
+        try:
+            memoryview(image)
+        except TypeError:
+            raise ValueError('a partial update needs a buffer')
+        if self._lut is not self.LUT_PARTIAL_UPDATE:
+            self.set_lut(self.LUT_PARTIAL_UPDATE)
+        yield from self._set_frame_memory(image, x, y, w, h)
+        yield from self._display_frame()
+        # the refresh switched memory areas, write the window again so both hold it
+        yield from self._set_frame_memory(image, x, y, w, h)
 
     # specify the memory area for data R/W
     def set_memory_area(self, x_start, y_start, x_end, y_end):
-        self._command(SET_RAM_X_ADDRESS_START_END_POSITION)
         # x point must be the multiple of 8 or the last 3 bits will be ignored
-        self._data(bytearray([(x_start >> 3) & 0xFF]))
-        self._data(bytearray([(x_end >> 3) & 0xFF]))
-        self._command(SET_RAM_Y_ADDRESS_START_END_POSITION, ustruct.pack("<HH", y_start, y_end))
+        self._command_args(SET_RAM_X_ADDRESS_START_END_POSITION, 2, (x_start >> 3) & 0xFF, (x_end >> 3) & 0xFF)
+        self._command_args(SET_RAM_Y_ADDRESS_START_END_POSITION, 4, y_start & 0xFF, y_start >> 8, y_end & 0xFF, y_end >> 8)
 
     # specify the start point for data R/W
     def set_memory_pointer(self, x, y):
-        self._command(SET_RAM_X_ADDRESS_COUNTER)
+        self._run(self._set_memory_pointer(x, y))
+
+    def _set_memory_pointer(self, x, y):
         # x point must be the multiple of 8 or the last 3 bits will be ignored
-        self._data(bytearray([(x >> 3) & 0xFF]))
-        self._command(SET_RAM_Y_ADDRESS_COUNTER, ustruct.pack("<H", y))
-        self.wait_until_idle()
+        self._command_args(SET_RAM_X_ADDRESS_COUNTER, 1, (x >> 3) & 0xFF)
+        self._command_args(SET_RAM_Y_ADDRESS_COUNTER, 2, y & 0xFF, y >> 8)
+        yield WAIT_IDLE
 
     # to wake call reset() or init()
-    def sleep(self):
+    def _sleep(self):
         self._command(DEEP_SLEEP_MODE)
-        self.wait_until_idle()
+        yield WAIT_IDLE
@@ -26,7 +26,7 @@ SOFTWARE.
 """
 
 from micropython import const
-from time import sleep_ms
+from epdif import EPDIF, WAIT_IDLE, REFRESH
 
 # Display resolution
 EPD_WIDTH  = const(176)
@@ -74,70 +74,41 @@ POWER_OPTIMIZATION                = const(0xF8) # Power optimization in flow dia
 
 BUSY = const(0)  # 0=busy, 1=idle
 
-class EPD:
+# init sequence: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+INIT_SEQUENCE = (
+    b'\x01\x05\x03\x00\x2B\x2B\x09' # POWER_SETTING: VDS_EN VDG_EN, VCOM_HV VGHL_LV[1] VGHL_LV[0], VDH, VDL, VDHR
+    b'\x06\x03\x07\x07\x17'         # BOOSTER_SOFT_START
+    b'\xF8\x02\x60\xA5'             # POWER_OPTIMIZATION
+    b'\xF8\x02\x89\xA5'             # POWER_OPTIMIZATION
+    b'\xF8\x02\x90\x00'             # POWER_OPTIMIZATION
+    b'\xF8\x02\x93\x2A'             # POWER_OPTIMIZATION
+    b'\xF8\x02\xA0\xA5'             # POWER_OPTIMIZATION
+    b'\xF8\x02\xA1\x00'             # POWER_OPTIMIZATION
+    b'\xF8\x02\x73\x41'             # POWER_OPTIMIZATION
+    b'\x16\x01\x00'                 # PARTIAL_DISPLAY_REFRESH
+    b'\x04\x80'                     # POWER_ON, then wait until idle
+    b'\x00\x01\xAF'                 # PANEL_SETTING: KW-BF   KWR-AF    BWROTP 0f
+    b'\x30\x01\x3A'                 # PLL_CONTROL: 3A 100HZ   29 150Hz 39 200HZ    31 171HZ
+    b'\x82\x41\x12\x02'             # VCM_DC_SETTING_REGISTER, then wait 2 ms
+)
+
+class EPD(EPDIF):
     def __init__(self, spi, cs, dc, rst, busy):
-        self.spi = spi
-        self.cs = cs
-        self.dc = dc
-        self.rst = rst
-        self.busy = busy
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
-        self.rst.init(self.rst.OUT, value=0)
-        self.busy.init(self.busy.IN)
+        super().__init__(spi, cs, dc, rst, busy, BUSY)
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
 
     LUT_VCOM_DC = bytearray(b'\x00\x00\x00\x0F\x0F\x00\x00\x05\x00\x32\x32\x00\x00\x02\x00\x0F\x0F\x00\x00\x05\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00')
     LUT_WW      = bytearray(b'\x50\x0F\x0F\x00\x00\x05\x60\x32\x32\x00\x00\x02\xA0\x0F\x0F\x00\x00\x05\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00') # R21H
-    LUT_BW      = LUT_BW # R22H r
+    LUT_BW      = LUT_WW # R22H r
     LUT_BB      = bytearray(b'\xA0\x0F\x0F\x00\x00\x05\x60\x32\x32\x00\x00\x02\x50\x0F\x0F\x00\x00\x05\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00') # R24H b
     LUT_WB      = LUT_BB # R23H w
 
-    def _command(self, command, data=None):
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        if data is not None:
-            self._data(data)
-
-    def _data(self, data):
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
-
-    def init(self):
-        self.reset()
-        self._command(POWER_SETTING, b'\x03\x00\x2B\x2B\x09') # VDS_EN VDG_EN, VCOM_HV VGHL_LV[1] VGHL_LV[0], VDH, VDL, VDHR
-        self._command(BOOSTER_SOFT_START, b'\x07\x07\x17')
-        self._command(POWER_OPTIMIZATION, b'\x60\xA5')
-        self._command(POWER_OPTIMIZATION, b'\x89\xA5')
-        self._command(POWER_OPTIMIZATION, b'\x90\x00')
-        self._command(POWER_OPTIMIZATION, b'\x93\x2A')
-        self._command(POWER_OPTIMIZATION, b'\xA0\xA5')
-        self._command(POWER_OPTIMIZATION, b'\xA1\x00')
-        self._command(POWER_OPTIMIZATION, b'\x73\x41')
-        self._command(PARTIAL_DISPLAY_REFRESH, b'\x00')
-        self._command(POWER_ON)
-        self.wait_until_idle()
-        self._command(PANEL_SETTING, b'\xAF') # KW-BF   KWR-AF    BWROTP 0f
-        self._command(PLL_CONTROL, b'\x3A') # 3A 100HZ   29 150Hz 39 200HZ    31 171HZ
-        self._command(VCM_DC_SETTING_REGISTER, b'\x12')
-        sleep_ms(2)
+    def _init(self):
+        yield from self._reset()
+        yield from self._script(INIT_SEQUENCE)
         self.set_lut()
 
-    def wait_until_idle(self):
-        while self.busy.value() == BUSY:
-            sleep_ms(100)
-
-    def reset(self):
-        self.rst(0)
-        sleep_ms(200)
-        self.rst(1)
-        sleep_ms(200)
-
     def set_lut(self):
         self._command(LUT_FOR_VCOM, self.LUT_VCOM_DC)  # vcom
         self._command(LUT_WHITE_TO_WHITE, self.LUT_WW) # ww --
@@ -146,21 +117,22 @@ class EPD:
         self._command(LUT_BLACK_TO_BLACK, self.LUT_WB) # bb b
 
     # draw the current frame memory
-    def display_frame(self, frame_buffer):
+    def _display_frame(self, frame_buffer):
+        self._check(frame_buffer, EPD_WIDTH * EPD_HEIGHT // 8)
         if (frame_buffer != None):
             self._command(DATA_START_TRANSMISSION_1)
-            sleep_ms(2)
-            for i in range(0, self.width * self.height // 8):
-                self._data(bytearray([0xFF]))
-            sleep_ms(2)
+            yield 2
+            self._fill(0xFF, EPD_WIDTH * EPD_HEIGHT // 8)
+            yield 2
             self._command(DATA_START_TRANSMISSION_2)
-            sleep_ms(2)
-            for i in range(0, self.width * self.height // 8):
-                self._data(bytearray([frame_buffer[i]]))
-            sleep_ms(2)
+            yield 2
+            yield from self._send(frame_buffer, EPD_WIDTH * EPD_HEIGHT // 8)
+            yield 2
             self._command(DISPLAY_REFRESH)
-            self.wait_until_idle()
+            yield REFRESH
+            yield WAIT_IDLE
 
     # to wake call reset() or init()
-    def sleep(self):
+    def _sleep(self):
         self._command(DEEP_SLEEP, b'\xA5')
+        yield 0 # nothing to wait for, but still a step generator
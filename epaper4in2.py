@@ -26,8 +26,8 @@ SOFTWARE.
 """
 
 from micropython import const
-from time import sleep_ms
-import ustruct
+from epdif import EPDIF, WAIT_IDLE, REFRESH, FILL_CHUNK
+from epdpartial import PartialWindow
 
 # Display resolution
 EPD_WIDTH  = const(400)
@@ -66,8 +66,8 @@ RESOLUTION_SETTING             = const(0x61)
 #READ_VCOM_VALUE                = const(0x81)
 VCM_DC_SETTING                 = const(0x82)
 #PARTIAL_WINDOW                 = const(0x90)
-#PARTIAL_IN                     = const(0x91)
-#PARTIAL_OUT                    = const(0x92)
+PARTIAL_IN                     = const(0x91)
+PARTIAL_OUT                    = const(0x92)
 
 #PROGRAM_MODE                   = const(0xA0)
 #ACTIVE_PROGRAMMING             = const(0xA1)
@@ -76,19 +76,29 @@ VCM_DC_SETTING                 = const(0x82)
 
 BUSY = const(0)  # 0=busy, 1=idle
 
-class EPD:
-    def __init__(self, spi, cs, dc, rst, busy):
-        self.spi = spi
-        self.cs = cs
-        self.dc = dc
-        self.rst = rst
-        self.busy = busy
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
-        self.rst.init(self.rst.OUT, value=0)
-        self.busy.init(self.busy.IN)
+# Waveform profiles
+PROFILE_FULL    = const(0) # flashing full refresh, clears ghosting, about 4 s
+PROFILE_FAST    = const(1) # single phase, no flashing, under 1 s, ghosts build up
+PROFILE_PARTIAL = const(2) # differential, only changed pixels are driven
+
+# init sequence: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+INIT_SEQUENCE = (
+    b'\x01\x05\x03\x00\x2B\x2B\xFF' # POWER_SETTING: VDS_EN VDG_EN, VCOM_HV VGHL_LV[1] VGHL_LV[0], VDH, VDL, VDHR
+    b'\x06\x03\x17\x17\x17'         # BOOSTER_SOFT_START: 07 0f 17 1f 27 2F 37 2f
+    b'\x04\x80'                     # POWER_ON, then wait until idle
+    b'\x00\x02\xBF\x0B'             # PANEL_SETTING: KW-BF   KWR-AF  BWROTP 0f
+    b'\x30\x01\x3C'                 # PLL_CONTROL: 3A 100HZ   29 150Hz 39 200HZ  31 171HZ
+)
+
+class EPD(EPDIF, PartialWindow):
+    def __init__(self, spi, cs, dc, rst, busy, fill_chunk=FILL_CHUNK):
+        super().__init__(spi, cs, dc, rst, busy, BUSY, fill_chunk)
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
+        self._window = bytearray(9) # PARTIAL_WINDOW parameters
+        self.profile = PROFILE_FULL # waveform used by the next refresh
+        self._loaded = None # profile whose luts the controller holds
+        self._dtm1_valid = False # DTM1 holds the last whole frame, as the partial profile needs
 
     # 44/42 bytes (look up tables)
     LUT_VCOM0 = bytearray(b'\x00\x17\x00\x00\x00\x02\x00\x17\x17\x00\x00\x02\x00\x0A\x01\x00\x00\x01\x00\x0E\x0E\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00')
@@ -97,77 +107,161 @@ class EPD:
     LUT_BB    = bytearray(b'\x80\x17\x00\x00\x00\x02\x90\x17\x17\x00\x00\x02\x80\x0A\x01\x00\x00\x01\x50\x0E\x0E\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00')
     LUT_WB    = LUT_BB
 
-    def _command(self, command, data=None):
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        if data is not None:
-            self._data(data)
-
-    def _data(self, data):
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
-
-    def init(self):
-        self.reset()
-        self._command(POWER_SETTING, b'\x03\x00\x2B\x2B\xFF') # VDS_EN VDG_EN, VCOM_HV VGHL_LV[1] VGHL_LV[0], VDH, VDL, VDHR
-        self._command(BOOSTER_SOFT_START, b'\x17\x17\x17') # 07 0f 17 1f 27 2F 37 2f
-        self._command(POWER_ON)
-        self.wait_until_idle()
-        self._command(PANEL_SETTING, b'\xBF\x0B') # KW-BF   KWR-AF  BWROTP 0f
-        self._command(PLL_CONTROL, b'\x3C') # 3A 100HZ   29 150Hz 39 200HZ  31 171HZ
-
-    def wait_until_idle(self):
-        while self.busy.value() == BUSY:
-            sleep_ms(100)
-
-    def reset(self):
-        self.rst(0)
-        sleep_ms(200)
-        self.rst(1)
-        sleep_ms(200)
+    # https://github.com/waveshare/e-Paper quick refresh tables, one 14 frame phase, old data ignored
+    LUT_VCOM0_FAST = bytearray(b'\x00\x0E\x00\x00\x00\x01' + b'\x00' * 38)
+    LUT_WW_FAST    = bytearray(b'\xA0\x0E\x00\x00\x00\x01' + b'\x00' * 36)
+    LUT_BW_FAST    = LUT_WW_FAST
+    LUT_BB_FAST    = bytearray(b'\x50\x0E\x00\x00\x00\x01' + b'\x00' * 36)
+    LUT_WB_FAST    = LUT_BB_FAST
+
+    # https://github.com/ZinggJM/GxEPD2/blob/master/src/epd/GxEPD2_420.cpp partial update tables
+    # pixels whose old and new data match are not driven, so DTM1 must hold what is on screen
+    LUT_VCOM0_PARTIAL = bytearray(b'\x00\x19\x01\x02\x19\x01\x00\x01\x00\x00\x00\x01' + b'\x00' * 32)
+    LUT_WW_PARTIAL    = bytearray(b'\x18\x19\x01\x02\x19\x01\x00\x01\x00\x00\x00\x01' + b'\x00' * 30)
+    LUT_BW_PARTIAL    = bytearray(b'\x5A\x19\x01\x02\x19\x01\x00\x01\x00\x00\x00\x01' + b'\x00' * 30)
+    LUT_WB_PARTIAL    = bytearray(b'\xA5\x19\x01\x02\x19\x01\x00\x01\x00\x00\x00\x01' + b'\x00' * 30)
+    LUT_BB_PARTIAL    = bytearray(b'\x24\x19\x01\x02\x19\x01\x00\x01\x00\x00\x00\x01' + b'\x00' * 30)
+
+    # luts per profile, in command order: vcom, ww, bw, wb, bb
+    LUTS = (
+        (LUT_VCOM0, LUT_WW, LUT_BW, LUT_BB, LUT_WB),
+        (LUT_VCOM0_FAST, LUT_WW_FAST, LUT_BW_FAST, LUT_WB_FAST, LUT_BB_FAST),
+        (LUT_VCOM0_PARTIAL, LUT_WW_PARTIAL, LUT_BW_PARTIAL, LUT_WB_PARTIAL, LUT_BB_PARTIAL),
+    )
+
+    def _init(self):
+        self._loaded = None # reset clears the lut registers
+        self._dtm1_valid = False # and the frame memory is unknown
+        yield from self._reset()
+        yield from self._script(INIT_SEQUENCE)
 
+    # upload the luts of the current profile
     def set_lut(self):
-        self._command(LUT_FOR_VCOM, self.LUT_VCOM0)    # vcom
-        self._command(LUT_WHITE_TO_WHITE, self.LUT_WW) # ww --
-        self._command(LUT_BLACK_TO_WHITE, self.LUT_BW) # bw r
-        self._command(LUT_WHITE_TO_BLACK, self.LUT_BB) # wb w
-        self._command(LUT_BLACK_TO_BLACK, self.LUT_WB) # bb b
+        self._load(self.profile)
+
+    def _load(self, profile):
+        vcom, ww, bw, wb, bb = self.LUTS[profile]
+        self._command(LUT_FOR_VCOM, vcom)     # vcom
+        self._command(LUT_WHITE_TO_WHITE, ww) # ww --
+        self._command(LUT_BLACK_TO_WHITE, bw) # bw r
+        self._command(LUT_WHITE_TO_BLACK, wb) # wb w
+        self._command(LUT_BLACK_TO_BLACK, bb) # bb b
+        self._loaded = profile
+
+    # select the waveform for the following refreshes, one of PROFILE_FULL, PROFILE_FAST or PROFILE_PARTIAL
+    # the luts are only uploaded when the profile changes
+    def set_profile(self, profile):
+        if not 0 <= profile < len(self.LUTS):
+            raise ValueError('unknown profile')
+        self.profile = profile
+        if self._loaded != profile:
+            self.set_lut()
+
+    # raise before anything is sent if image can't be written with the current profile
+    # returns whether image is a buffer
+    def _check_image(self, image, size):
+        self._check(image, size)
+        try:
+            memoryview(image)
+        except TypeError:
+            if self.profile == PROFILE_PARTIAL:
+                raise ValueError('the partial profile needs a buffer')
+            return False
+        return True
+
+    # the waveform for the next refresh: the partial one compares with DTM1, so until a whole
+    # frame has gone there from a buffer, after init() or a streamed frame, the full one is used
+    def _refresh_profile(self):
+        if self.profile == PROFILE_PARTIAL and not self._dtm1_valid:
+            return PROFILE_FULL
+        return self.profile
+
+    # send image as the new data (DTM2)
+    # the full and fast waveforms ignore the old data (DTM1), so it gets the image too,
+    # the partial waveform compares with it, so it keeps what is on screen until after the refresh
+    # an iterable of chunks can only be sent once, so it only goes to DTM2 and leaves DTM1 stale,
+    # and the partial profile, which needs it again afterwards, only takes buffers
+    def _write_planes(self, image, size, buffer, partial):
+        if not buffer:
+            self._dtm1_valid = False
+        elif not partial:
+            self._command(DATA_START_TRANSMISSION_1)
+            yield from self._send(image, size)
+            yield 2
+        self._command(DATA_START_TRANSMISSION_2)
+        yield from self._send(image, size)
+        yield 2
+
+    # after a partial profile refresh image is on screen, so it becomes the old data
+    def _refreshed(self, image, size, partial):
+        if partial:
+            self._command(DATA_START_TRANSMISSION_1)
+            yield from self._send(image, size)
 
     # draw the current frame memory
-    def display_frame(self, frame_buffer):
-        self._command(RESOLUTION_SETTING, ustruct.pack(">HH", EPD_WIDTH, EPD_HEIGHT))
+    def _display_frame(self, frame_buffer):
+        size = self.width * self.height // 8
+        if (frame_buffer != None):
+            buffer = self._check_image(frame_buffer, size)
+        self._command_args(RESOLUTION_SETTING, 4, EPD_WIDTH >> 8, EPD_WIDTH & 0xFF, EPD_HEIGHT >> 8, EPD_HEIGHT & 0xFF)
         self._command(VCM_DC_SETTING, b'\x12')
         self._command(VCOM_AND_DATA_INTERVAL_SETTING)
         self._command(0x97) # VBDF 17|D7 VBDW 97  VBDB 57  VBDF F7  VBDW 77  VBDB 37  VBDR B7
         # TODO should ^ this be _data(0x97), not sure what it does
 
+        # bit set: white, bit reset: black, straight from the caller's buffer
+        profile = self._refresh_profile()
+        partial = profile == PROFILE_PARTIAL
         if (frame_buffer != None):
-            self._command(DATA_START_TRANSMISSION_1)
-            for i in range(0, self.width * self.height // 8):
-                self._data(bytearray([0xFF])) # bit set: white, bit reset: black
-            sleep_ms(2)
-            self._command(DATA_START_TRANSMISSION_2)
-            for i in range(0, self.width * self.height // 8):
-                self._data(bytearray([frame_buffer[i]]))
-            sleep_ms(2)
-
-        self.set_lut()
+            yield from self._write_planes(frame_buffer, size, buffer, partial)
+
+        if self._loaded != profile:
+            self._load(profile)
         self._command(DISPLAY_REFRESH)
-        sleep_ms(100)
-        self.wait_until_idle()
+        yield REFRESH
+        yield 100
+        yield WAIT_IDLE
+        if (frame_buffer != None):
+            yield from self._refreshed(frame_buffer, size, partial)
+            if buffer:
+                self._dtm1_valid = True
+
+    # refresh one window, image holds its w x h pixels in rows of w // 8 bytes
+    # only the window is sent, x and w must be multiples of 8
+    def display_partial(self, image, x, y, w, h):
+        self._run(self._display_partial(image, x, y, w, h))
+
+    async def display_partial_async(self, image, x, y, w, h):
+        await self._run_async(self._display_partial(image, x, y, w, h))
+
+    def _display_partial(self, image, x, y, w, h):
+        x, y, x_end, y_end, size = self._partial_bounds(x, y, w, h)
+        buffer = self._check_image(image, size)
+        profile = self._refresh_profile()
+        partial = profile == PROFILE_PARTIAL
+        if self._loaded != profile:
+            self._load(profile)
+        self._command(PARTIAL_IN)
+        # a stream that runs short still raises in _send, leave partial mode anyway
+        try:
+            self._set_partial_window(x, y, x_end, y_end)
+            yield from self._write_planes(image, size, buffer, partial)
+            self._command(DISPLAY_REFRESH)
+            yield REFRESH
+            yield 100
+            yield WAIT_IDLE
+            yield from self._refreshed(image, size, partial)
+        finally:
+            self._command(PARTIAL_OUT)
 
     # to wake call reset() or init()
-    def sleep(self):
+    def _sleep(self):
         self._command(VCOM_AND_DATA_INTERVAL_SETTING, b'\x17') # border floating
         self._command(VCM_DC_SETTING) # VCOM to 0V
         self._command(PANEL_SETTING)
-        sleep_ms(100)
+        yield 100
         self._command(POWER_SETTING, b'\x00\x00\x00\x00\x00') # VG&VS to 0V fast
-        sleep_ms(100)
+        yield 100
         self._command(POWER_OFF)
-        self.wait_until_idle()
+        yield WAIT_IDLE
         self._command(DEEP_SLEEP, b'\xA5')
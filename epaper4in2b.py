@@ -28,7 +28,8 @@ SOFTWARE.
 # also works for black/white/yellow GDEW042C37?
 
 from micropython import const
-from time import sleep_ms
+from epdif import EPDIF, WAIT_IDLE, REFRESH
+from epdpartial import PartialWindow
 
 # Display resolution
 EPD_WIDTH  = const(400)
@@ -76,72 +77,49 @@ VCOM_AND_DATA_INTERVAL_SETTING = const(0x50)
 
 BUSY = const(0)  # 0=busy, 1=idle
 
-class EPD:
+# init sequence: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+INIT_SEQUENCE = (
+    b'\x06\x03\x17\x17\x17' # BOOSTER_SOFT_START: 07 0f 17 1f 27 2F 37 2f
+    b'\x04\x80'             # POWER_ON, then wait until idle
+    b'\x00\x01\x0F'         # PANEL_SETTING: LUT from OTP
+)
+
+class EPD(EPDIF, PartialWindow):
+    COLORED = 0 # bit value of a black or red pixel in either plane
+
     def __init__(self, spi, cs, dc, rst, busy):
-        self.spi = spi
-        self.cs = cs
-        self.dc = dc
-        self.rst = rst
-        self.busy = busy
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
-        self.rst.init(self.rst.OUT, value=0)
-        self.busy.init(self.busy.IN)
+        super().__init__(spi, cs, dc, rst, busy, BUSY)
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
+        self._window = bytearray(9) # PARTIAL_WINDOW parameters
 
-    def _command(self, command, data=None):
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        if data is not None:
-            self._data(data)
-
-    def _data(self, data):
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
-
-    def init(self):
-        self.reset()
-        self._command(BOOSTER_SOFT_START, b'\x17\x17\x17') # 07 0f 17 1f 27 2F 37 2f
-        self._command(POWER_ON)
-        self.wait_until_idle()
-        self._command(PANEL_SETTING, b'\x0F') # LUT from OTP
-
-    def wait_until_idle(self):
-        while self.busy.value() == BUSY:
-            sleep_ms(100)
-
-    def reset(self):
-        self.rst(0)
-        sleep_ms(200)
-        self.rst(1)
-        sleep_ms(200)
+    def _init(self):
+        yield from self._reset()
+        yield from self._script(INIT_SEQUENCE)
 
     # draw the current frame memory
-    def display_frame(self, frame_buffer_black, frame_buffer_red):
+    def _display_frame(self, frame_buffer_black, frame_buffer_red):
+        self._check(frame_buffer_black, EPD_WIDTH * EPD_HEIGHT // 8)
+        self._check(frame_buffer_red, EPD_WIDTH * EPD_HEIGHT // 8)
         if (frame_buffer_black != None):
             self._command(DATA_START_TRANSMISSION_1)
-            sleep_ms(2)
-            for i in range(0, self.width * self.height // 8):
-                self._data(bytearray([frame_buffer_black[i]]))
-            sleep_ms(2)
+            yield 2
+            yield from self._send(frame_buffer_black, EPD_WIDTH * EPD_HEIGHT // 8)
+            yield 2
         if (frame_buffer_red != None):
             self._command(DATA_START_TRANSMISSION_2)
-            sleep_ms(2)
-            for i in range(0, self.width * self.height // 8):
-                self._data(bytearray([frame_buffer_red[i]]))
-            sleep_ms(2)
+            yield 2
+            yield from self._send(frame_buffer_red, EPD_WIDTH * EPD_HEIGHT // 8)
+            yield 2
 
         self._command(DISPLAY_REFRESH)
-        self.wait_until_idle()
+
+        yield REFRESH
+        yield WAIT_IDLE
 
     # to wake call reset() or init()
-    def sleep(self):
+    def _sleep(self):
         self._command(VCOM_AND_DATA_INTERVAL_SETTING, b'\xF7') # border floating
         self._command(POWER_OFF)
-        self.wait_until_idle()
+        yield WAIT_IDLE
         self._command(DEEP_SLEEP, b'\xA5') # check code
@@ -26,8 +26,7 @@ SOFTWARE.
 """
 
 from micropython import const
-from time import sleep_ms
-import ustruct
+from epdif import EPDIF, WAIT_IDLE, REFRESH
 
 # Display resolution
 EPD_WIDTH  = const(600)
@@ -75,91 +74,72 @@ FLASH_MODE                     = const(0xE5)
 
 BUSY = const(0)  # 0=busy, 1=idle
 
-class EPD:
+# init sequence: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+INIT_SEQUENCE = (
+    b'\x01\x02\x37\x00'         # POWER_SETTING
+    b'\x00\x02\xCF\x08'         # PANEL_SETTING
+    b'\x06\x03\xC7\xCC\x28'     # BOOSTER_SOFT_START
+    b'\x04\x80'                 # POWER_ON, then wait until idle
+    b'\x30\x01\x3C'             # PLL_CONTROL
+    b'\x41\x01\x00'             # TEMPERATURE_CALIBRATION
+    b'\x50\x01\x77'             # VCOM_AND_DATA_INTERVAL_SETTING
+    b'\x60\x01\x22'             # TCON_SETTING
+    b'\x61\x04\x02\x58\x01\xC0' # TCON_RESOLUTION
+    b'\x82\x01\x1E'             # VCM_DC_SETTING: decide by LUT file
+    b'\xE5\x01\x03'             # FLASH_MODE
+)
+
+# 2bpp to 4bpp lookup, 2 output bytes per input byte (2 pixels per output byte)
+# 0b11: white 0x3, 0b00: black 0x0, anything else: 0x4
+def _pack_table():
+    table = bytearray(512)
+    for i in range(512):
+        bits = (i >> 1) << ((i & 1) * 4)
+        hi = (bits >> 6) & 0x03
+        lo = (bits >> 4) & 0x03
+        table[i] = ((0x03 if hi == 0x03 else 0x04 if hi else 0x00) << 4) | (0x03 if lo == 0x03 else 0x04 if lo else 0x00)
+    return table
+
+PACK_2BPP = _pack_table()
+
+class EPD(EPDIF):
     def __init__(self, spi, cs, dc, rst, busy):
-        self.spi = spi
-        self.cs = cs
-        self.dc = dc
-        self.rst = rst
-        self.busy = busy
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
-        self.rst.init(self.rst.OUT, value=0)
-        self.busy.init(self.busy.IN)
+        super().__init__(spi, cs, dc, rst, busy, BUSY)
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
-
-    def _command(self, command, data=None):
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        if data is not None:
-            self._data(data)
-
-    def _data(self, data):
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
-
-    def init(self):
-        self.reset()
-        self._command(POWER_SETTING, b'\x37\x00')
-        self._command(PANEL_SETTING, b'\xCF\x08')
-        self._command(BOOSTER_SOFT_START, b'\xC7\xCC\x28')
-        self._command(POWER_ON)
-        self.wait_until_idle()
-        self._command(PLL_CONTROL, b'\x3C')
-        self._command(TEMPERATURE_CALIBRATION, b'\x00')
-        self._command(VCOM_AND_DATA_INTERVAL_SETTING, b'\x77')
-        self._command(TCON_SETTING, b'\x22')
-        self._command(TCON_RESOLUTION, ustruct.pack(">HH", EPD_WIDTH, EPD_HEIGHT))
-        self._command(VCM_DC_SETTING, b'\x1E') # decide by LUT file
-        self._command(FLASH_MODE, b'\x03')
-
-    def wait_until_idle(self):
-        while self.busy.value() == BUSY:
-            sleep_ms(100)
-
-    def reset(self):
-        self.rst(0)
-        sleep_ms(200)
-        self.rst(1)
-        sleep_ms(200)
+        self._row = bytearray(EPD_WIDTH // 2) # one converted row, 4bpp
+
+    def _init(self):
+        yield from self._reset()
+        yield from self._script(INIT_SEQUENCE)
+
+    # pack one row of 2bpp pixels starting at offset into the 4bpp row buffer
+    def _pack_row(self, frame_buffer, offset):
+        row = self._row
+        lut = PACK_2BPP
+        j = 0
+        for i in range(offset, offset + len(row) // 2):
+            k = frame_buffer[i] << 1
+            row[j] = lut[k]
+            row[j + 1] = lut[k + 1]
+            j += 2
+        return row
 
     # draw the current frame memory
-    def display_frame(self, frame_buffer):
+    def _display_frame(self, frame_buffer):
         if (frame_buffer != None):
+            frame, rows = self._rows(frame_buffer, self.width // 4, self.height)
             self._command(DATA_START_TRANSMISSION_1)
-            for i in range(0, self.width * self.height // 4):
-                temp1 = frame_buffer[i]
-                j = 0
-                while (j < 4):
-                    if ((temp1 & 0xC0) == 0xC0):
-                        temp2 = 0x03
-                    elif ((temp1 & 0xC0) == 0x00):
-                        temp2 = 0x00
-                    else:
-                        temp2 = 0x04
-                    temp2 = (temp2 << 4) & 0xFF
-                    temp1 = (temp1 << 2) & 0xFF
-                    j += 1
-                    if((temp1 & 0xC0) == 0xC0):
-                        temp2 |= 0x03
-                    elif ((temp1 & 0xC0) == 0x00):
-                        temp2 |= 0x00
-                    else:
-                        temp2 |= 0x04
-                    temp1 = (temp1 << 2) & 0xFF
-                    self._data(bytearray([temp2]))
-                    j += 1
+            for offset in rows:
+                self._data(self._pack_row(frame, offset))
+                yield 0
         self._command(DISPLAY_REFRESH)
-        sleep_ms(100)
-        self.wait_until_idle()
+        yield REFRESH
+        yield 100
+        yield WAIT_IDLE
 
     # to wake call reset() or init()
-    def sleep(self):
+    def _sleep(self):
         self._command(POWER_OFF)
-        self.wait_until_idle()
+        yield WAIT_IDLE
         self._command(DEEP_SLEEP, b'\xA5')
@@ -26,8 +26,7 @@ SOFTWARE.
 """
 
 from micropython import const
-from time import sleep_ms
-import ustruct
+from epdif import EPDIF, WAIT_IDLE, REFRESH
 
 # Display resolution
 EPD_WIDTH  = const(600)
@@ -75,95 +74,139 @@ FLASH_MODE                     = const(0xE5)
 
 BUSY = const(0)  # 0=busy, 1=idle
 
-class EPD:
+BAND_HEIGHT = const(32) # default rows per band for display_bands
+
+# init sequence: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+INIT_SEQUENCE = (
+    b'\x01\x02\x37\x00'         # POWER_SETTING
+    b'\x00\x02\xCF\x08'         # PANEL_SETTING
+    b'\x06\x03\xC7\xCC\x28'     # BOOSTER_SOFT_START
+    b'\x04\x80'                 # POWER_ON, then wait until idle
+    b'\x30\x01\x3C'             # PLL_CONTROL
+    b'\x41\x01\x00'             # TEMPERATURE_CALIBRATION
+    b'\x50\x01\x77'             # VCOM_AND_DATA_INTERVAL_SETTING
+    b'\x60\x01\x22'             # TCON_SETTING
+    b'\x61\x04\x02\x58\x01\xC0' # TCON_RESOLUTION
+    b'\x82\x01\x20'             # VCM_DC_SETTING: decide by LUT file
+    b'\xE5\x01\x03'             # FLASH_MODE
+)
+
+# 1bpp to 4bpp lookups, 4 output bytes per input byte (2 pixels per output byte)
+# black plane bit set: white 0x3, bit reset: black 0x0
+# red plane bit set: 0x0, bit reset: red 0x4
+def _expand_table(on, off):
+    table = bytearray(1024)
+    for i in range(1024):
+        bits = (i >> 2) << ((i & 3) * 2)
+        table[i] = ((on if bits & 0x80 else off) << 4) | (on if bits & 0x40 else off)
+    return table
+
+EXPAND_BLACK = _expand_table(0x03, 0x00)
+EXPAND_RED = _expand_table(0x00, 0x04)
+
+class EPD(EPDIF):
+    COLORED = 0 # bit value of a black or red pixel in either plane
+
     def __init__(self, spi, cs, dc, rst, busy):
-        self.spi = spi
-        self.cs = cs
-        self.dc = dc
-        self.rst = rst
-        self.busy = busy
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
-        self.rst.init(self.rst.OUT, value=0)
-        self.busy.init(self.busy.IN)
+        super().__init__(spi, cs, dc, rst, busy, BUSY)
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
-
-    def _command(self, command, data=None):
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        if data is not None:
-            self._data(data)
-
-    def _data(self, data):
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
-
-    def init(self):
-        self.reset()
-        self._command(POWER_SETTING, b'\x37\x00')
-        self._command(PANEL_SETTING, b'\xCF\x08')
-        self._command(BOOSTER_SOFT_START, b'\xC7\xCC\x28')
-        self._command(POWER_ON)
-        self.wait_until_idle()
-        self._command(PLL_CONTROL, b'\x3C')
-        self._command(TEMPERATURE_CALIBRATION, b'\x00')
-        self._command(VCOM_AND_DATA_INTERVAL_SETTING, b'\x77')
-        self._command(TCON_SETTING, b'\x22')
-        self._command(TCON_RESOLUTION, ustruct.pack(">HH", EPD_WIDTH, EPD_HEIGHT))
-        self._command(VCM_DC_SETTING, b'\x20') # decide by LUT file
-        self._command(FLASH_MODE, b'\x03')
-
-    def wait_until_idle(self):
-        while self.busy.value() == BUSY:
-            sleep_ms(100)
-
-    def reset(self):
-        self.rst(0)
-        sleep_ms(200)
-        self.rst(1)
-        sleep_ms(200)
+        self._row = bytearray(EPD_WIDTH // 2) # one converted row, 4bpp
+
+    def _init(self):
+        yield from self._reset()
+        yield from self._script(INIT_SEQUENCE)
+
+    # combine one row of black and red 1bpp pixels, starting at offset and offset_red,
+    # into the 4bpp row buffer
+    # red wins over black: clearing the black bit under a red pixel leaves just the red code
+    def _combine_row(self, frame_buffer_black, frame_buffer_red, offset, offset_red):
+        row = self._row
+        black = EXPAND_BLACK
+        red = EXPAND_RED
+        d = offset_red - offset
+        j = 0
+        for i in range(offset, offset + len(row) // 4):
+            r = frame_buffer_red[i + d]
+            k = (frame_buffer_black[i] & r) << 2
+            r <<= 2
+            row[j] = black[k] | red[r]
+            row[j + 1] = black[k + 1] | red[r + 1]
+            row[j + 2] = black[k + 2] | red[r + 2]
+            row[j + 3] = black[k + 3] | red[r + 3]
+            j += 4
+        return row
+
+    # expand one row of black only 1bpp pixels starting at offset into the 4bpp row buffer
+    def _expand_row(self, frame_buffer_black, offset):
+        row = self._row
+        black = EXPAND_BLACK
+        j = 0
+        for i in range(offset, offset + len(row) // 4):
+            k = frame_buffer_black[i] << 2
+            row[j] = black[k]
+            row[j + 1] = black[k + 1]
+            row[j + 2] = black[k + 2]
+            row[j + 3] = black[k + 3]
+            j += 4
+        return row
 
     # draw the current frame memory
-    def display_frame(self, frame_buffer_black, frame_buffer_red):
-        if (frame_buffer != None and frame_buffer_red != None):
+    # frame_buffer_red may be None for a black/white only frame
+    def _display_frame(self, frame_buffer_black, frame_buffer_red):
+        if (frame_buffer_black != None):
+            stride = self.width // 8
+            black, rows = self._rows(frame_buffer_black, stride, self.height)
+            if (frame_buffer_red != None):
+                red, rows_red = self._rows(frame_buffer_red, stride, self.height)
             self._command(DATA_START_TRANSMISSION_1)
-            for i in range(0, self.width * self.height // 8):
-                temp1 = frame_buffer_black[i]
-                temp2 = frame_buffer_red[i]
-                j = 0
-                while (j < 8):
-                    if ((temp2 & 0x80) == 0x00):
-                        temp3 = 0x04                #red
-                    elif ((temp1 & 0x80) == 0x00):
-                        temp3 = 0x00                #black
-                    else:
-                        temp3 = 0x03                #white
-
-                    temp3 = (temp3 << 4) & 0xFF
-                    temp1 = (temp1 << 1) & 0xFF
-                    temp2 = (temp2 << 1) & 0xFF
-                    j += 1
-                    if ((temp2 & 0x80) == 0x00):
-                        temp3 |= 0x04              #red
-                    elif ((temp1 & 0x80) == 0x00):
-                        temp3 |= 0x00              #black
-                    else:
-                        temp3 |= 0x03              #white
-                    temp1 = (temp1 << 1) & 0xFF
-                    temp2 = (temp2 << 1) & 0xFF
-                    self._data(bytearray([temp3]))
-                    j += 1
+            if (frame_buffer_red != None):
+                for offset in rows:
+                    self._data(self._combine_row(black, red, offset, next(rows_red)))
+                    yield 0
+                for _ in rows_red: # checks an iterable red plane ends with the black one
+                    pass
+            else:
+                for offset in rows:
+                    self._data(self._expand_row(black, offset))
+                    yield 0
+        self._command(DISPLAY_REFRESH)
+        yield REFRESH
+        yield 100
+        yield WAIT_IDLE
+
+    # render and send a frame one band of rows at a time, peak ram is one band instead of a frame
+    # draw(fb_black, fb_red, y) is called for each band with two white MONO_HLSB framebufs
+    # band_height rows tall, whose row 0 is panel row y, so draw at (x, row - y)
+    # bit reset: black on fb_black, red on fb_red, red wins over black
+    def display_bands(self, draw, band_height=BAND_HEIGHT):
+        self._run(self._display_bands(draw, band_height))
+
+    async def display_bands_async(self, draw, band_height=BAND_HEIGHT):
+        await self._run_async(self._display_bands(draw, band_height))
+
+    def _display_bands(self, draw, band_height):
+        import framebuf
+        stride = self.width // 8
+        band_black = bytearray(stride * band_height)
+        band_red = bytearray(stride * band_height)
+        fb_black = framebuf.FrameBuffer(band_black, self.width, band_height, framebuf.MONO_HLSB)
+        fb_red = framebuf.FrameBuffer(band_red, self.width, band_height, framebuf.MONO_HLSB)
+        self._command(DATA_START_TRANSMISSION_1)
+        for y in range(0, self.height, band_height):
+            fb_black.fill(1)
+            fb_red.fill(1)
+            draw(fb_black, fb_red, y)
+            for r in range(min(band_height, self.height - y)):
+                self._data(self._combine_row(band_black, band_red, r * stride, r * stride))
+                yield 0
         self._command(DISPLAY_REFRESH)
-        sleep_ms(100)
-        self.wait_until_idle()
+        yield REFRESH
+        yield 100
+        yield WAIT_IDLE
 
     # to wake call reset() or init()
-    def sleep(self):
+    def _sleep(self):
         self._command(POWER_OFF)
-        self.wait_until_idle()
+        yield WAIT_IDLE
         self._command(DEEP_SLEEP, b'\xA5')
@@ -26,8 +26,7 @@ SOFTWARE.
 """
 
 from micropython import const
-from time import sleep_ms
-import ustruct
+from epdif import EPDIF, WAIT_IDLE, REFRESH
 
 # Display resolution
 EPD_WIDTH  = const(640)
@@ -75,86 +74,99 @@ FLASH_MODE                     = const(0xE5)
 
 BUSY = const(0)  # 0=busy, 1=idle
 
-class EPD:
+BAND_HEIGHT = const(32) # default rows per band for display_bands
+
+# init sequence: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+INIT_SEQUENCE = (
+    b'\x01\x02\x37\x00'         # POWER_SETTING
+    b'\x00\x02\xCF\x08'         # PANEL_SETTING
+    b'\x06\x03\xC7\xCC\x28'     # BOOSTER_SOFT_START
+    b'\x04\x80'                 # POWER_ON, then wait until idle
+    b'\x30\x01\x3C'             # PLL_CONTROL
+    b'\x41\x01\x00'             # TEMPERATURE_CALIBRATION
+    b'\x50\x01\x77'             # VCOM_AND_DATA_INTERVAL_SETTING
+    b'\x60\x01\x22'             # TCON_SETTING
+    b'\x61\x04\x02\x80\x01\x80' # TCON_RESOLUTION
+    b'\x82\x01\x1E'             # VCM_DC_SETTING: decide by LUT file
+    b'\xE5\x01\x03'             # FLASH_MODE
+)
+
+# 1bpp to 4bpp lookup, 4 output bytes per input byte (2 pixels per output byte)
+# bit set: white 0x3, bit reset: black 0x0
+def _expand_table():
+    table = bytearray(1024)
+    for i in range(1024):
+        bits = (i >> 2) << ((i & 3) * 2)
+        table[i] = (0x30 if bits & 0x80 else 0x00) | (0x03 if bits & 0x40 else 0x00)
+    return table
+
+EXPAND = _expand_table()
+
+class EPD(EPDIF):
     def __init__(self, spi, cs, dc, rst, busy):
-        self.spi = spi
-        self.cs = cs
-        self.dc = dc
-        self.rst = rst
-        self.busy = busy
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
-        self.rst.init(self.rst.OUT, value=0)
-        self.busy.init(self.busy.IN)
+        super().__init__(spi, cs, dc, rst, busy, BUSY)
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
-
-    def _command(self, command, data=None):
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        if data is not None:
-            self._data(data)
-
-    def _data(self, data):
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
-
-    def init(self):
-        self.reset()
-        self._command(POWER_SETTING, b'\x37\x00')
-        self._command(PANEL_SETTING, b'\xCF\x08')
-        self._command(BOOSTER_SOFT_START, b'\xC7\xCC\x28')
-        self._command(POWER_ON)
-        self.wait_until_idle()
-        self._command(PLL_CONTROL, b'\x3C')
-        self._command(TEMPERATURE_CALIBRATION, b'\x00')
-        self._command(VCOM_AND_DATA_INTERVAL_SETTING, b'\x77')
-        self._command(TCON_SETTING, b'\x22')
-        self._command(TCON_RESOLUTION, ustruct.pack(">HH", EPD_WIDTH, EPD_HEIGHT))
-        self._command(VCM_DC_SETTING, b'\x1E') # decide by LUT file
-        self._command(FLASH_MODE, b'\x03')
-
-    def wait_until_idle(self):
-        while self.busy.value() == BUSY:
-            sleep_ms(100)
-
-    def reset(self):
-        self.rst(0)
-        sleep_ms(200)
-        self.rst(1)
-        sleep_ms(200)
+        self._row = bytearray(EPD_WIDTH // 2) # one converted row, 4bpp
+
+    def _init(self):
+        yield from self._reset()
+        yield from self._script(INIT_SEQUENCE)
+
+    # expand one row of 1bpp pixels starting at offset into the 4bpp row buffer
+    def _expand_row(self, frame_buffer, offset):
+        row = self._row
+        lut = EXPAND
+        j = 0
+        for i in range(offset, offset + len(row) // 4):
+            k = frame_buffer[i] << 2
+            row[j] = lut[k]
+            row[j + 1] = lut[k + 1]
+            row[j + 2] = lut[k + 2]
+            row[j + 3] = lut[k + 3]
+            j += 4
+        return row
 
     # draw the current frame memory
-    def display_frame(self, frame_buffer):
+    def _display_frame(self, frame_buffer):
+        frame, rows = self._rows(frame_buffer, self.width // 8, self.height)
+        self._command(DATA_START_TRANSMISSION_1)
+        for offset in rows:
+            self._data(self._expand_row(frame, offset))
+            yield 0
+        self._command(DISPLAY_REFRESH)
+        yield REFRESH
+        yield 100
+        yield WAIT_IDLE
+
+    # render and send a frame one band of rows at a time, peak ram is one band instead of a frame
+    # draw(fb, y) is called for each band with a white MONO_HLSB framebuf band_height rows tall,
+    # whose row 0 is panel row y, so draw at (x, row - y). Bit set: white, bit reset: black
+    def display_bands(self, draw, band_height=BAND_HEIGHT):
+        self._run(self._display_bands(draw, band_height))
+
+    async def display_bands_async(self, draw, band_height=BAND_HEIGHT):
+        await self._run_async(self._display_bands(draw, band_height))
+
+    def _display_bands(self, draw, band_height):
+        import framebuf
+        stride = self.width // 8
+        band = bytearray(stride * band_height)
+        fb = framebuf.FrameBuffer(band, self.width, band_height, framebuf.MONO_HLSB)
         self._command(DATA_START_TRANSMISSION_1)
-        for i in range(0, self.width * self.height // 8):
-            temp1 = frame_buffer[i]
-            j = 0
-            while (j < 8):
-                if (temp1 & 0x80):
-                    temp2 = 0x03
-                else:
-                    temp2 = 0x00
-                temp2 = (temp2 << 4) & 0xFF
-                temp1 = (temp1 << 1) & 0xFF
-                j += 1
-                if (temp1 & 0x80):
-                    temp2 |= 0x03
-                else:
-                    temp2 |= 0x00
-                temp1 = (temp1 << 1) & 0xFF
-                self._data(bytearray([temp2]))
-                j += 1
+        for y in range(0, self.height, band_height):
+            fb.fill(1)
+            draw(fb, y)
+            for r in range(min(band_height, self.height - y)):
+                self._data(self._expand_row(band, r * stride))
+                yield 0
         self._command(DISPLAY_REFRESH)
-        sleep_ms(100)
-        self.wait_until_idle()
+        yield REFRESH
+        yield 100
+        yield WAIT_IDLE
 
     # to wake call reset() or init()
-    def sleep(self):
+    def _sleep(self):
         self._command(POWER_OFF)
-        self.wait_until_idle()
+        yield WAIT_IDLE
         self._command(DEEP_SLEEP, b'\xA5')
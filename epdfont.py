@@ -0,0 +1,388 @@
+"""
+MicroPython Waveshare e-paper bitmap fonts and text drawing on 1bpp frame buffers
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from micropython import const
+
+# Fonts hand out pre-rasterised glyphs: glyph(ch) returns (data, offset, width, advance),
+# the glyph being height rows of (width + 7) // 8 bytes from data[offset], MSB leftmost,
+# and kern(a, b) the pixels to add between two characters.
+
+# 5x8 glyphs for ' ' to '~', one byte per row (bits 7 to 3), baseline on row 6
+FONT5X8 = (
+    b'\x00\x00\x00\x00\x00\x00\x00\x00' # space
+    b'\x20\x20\x20\x20\x20\x00\x20\x00' # !
+    b'\x50\x50\x50\x00\x00\x00\x00\x00' # "
+    b'\x50\x50\xF8\x50\xF8\x50\x50\x00' # #
+    b'\x20\x78\xA0\x70\x28\xF0\x20\x00' # $
+    b'\xC0\xC8\x10\x20\x40\x98\x18\x00' # %
+    b'\x60\x90\xA0\x40\xA8\x90\x68\x00' # &
+    b'\x60\x20\x40\x00\x00\x00\x00\x00' # '
+    b'\x10\x20\x40\x40\x40\x20\x10\x00' # (
+    b'\x40\x20\x10\x10\x10\x20\x40\x00' # )
+    b'\x00\x20\xA8\x70\xA8\x20\x00\x00' # *
+    b'\x00\x20\x20\xF8\x20\x20\x00\x00' # +
+    b'\x00\x00\x00\x00\x00\x60\x20\x40' # ,
+    b'\x00\x00\x00\xF8\x00\x00\x00\x00' # -
+    b'\x00\x00\x00\x00\x00\x60\x60\x00' # .
+    b'\x00\x08\x10\x20\x40\x80\x00\x00' # /
+    b'\x70\x88\x98\xA8\xC8\x88\x70\x00' # 0
+    b'\x20\x60\x20\x20\x20\x20\x70\x00' # 1
+    b'\x70\x88\x08\x10\x20\x40\xF8\x00' # 2
+    b'\xF8\x10\x20\x10\x08\x88\x70\x00' # 3
+    b'\x10\x30\x50\x90\xF8\x10\x10\x00' # 4
+    b'\xF8\x80\xF0\x08\x08\x88\x70\x00' # 5
+    b'\x30\x40\x80\xF0\x88\x88\x70\x00' # 6
+    b'\xF8\x08\x10\x20\x40\x40\x40\x00' # 7
+    b'\x70\x88\x88\x70\x88\x88\x70\x00' # 8
+    b'\x70\x88\x88\x78\x08\x10\x60\x00' # 9
+    b'\x00\x60\x60\x00\x60\x60\x00\x00' # :
+    b'\x00\x60\x60\x00\x60\x20\x40\x00' # ;
+    b'\x10\x20\x40\x80\x40\x20\x10\x00' # <
+    b'\x00\x00\xF8\x00\xF8\x00\x00\x00' # =
+    b'\x40\x20\x10\x08\x10\x20\x40\x00' # >
+    b'\x70\x88\x08\x10\x20\x00\x20\x00' # ?
+    b'\x70\x88\x08\x68\xA8\xA8\x70\x00' # @
+    b'\x70\x88\x88\xF8\x88\x88\x88\x00' # A
+    b'\xF0\x88\x88\xF0\x88\x88\xF0\x00' # B
+    b'\x70\x88\x80\x80\x80\x88\x70\x00' # C
+    b'\xE0\x90\x88\x88\x88\x90\xE0\x00' # D
+    b'\xF8\x80\x80\xF0\x80\x80\xF8\x00' # E
+    b'\xF8\x80\x80\xF0\x80\x80\x80\x00' # F
+    b'\x70\x88\x80\xB8\x88\x88\x78\x00' # G
+    b'\x88\x88\x88\xF8\x88\x88\x88\x00' # H
+    b'\x70\x20\x20\x20\x20\x20\x70\x00' # I
+    b'\x38\x10\x10\x10\x10\x90\x60\x00' # J
+    b'\x88\x90\xA0\xC0\xA0\x90\x88\x00' # K
+    b'\x80\x80\x80\x80\x80\x80\xF8\x00' # L
+    b'\x88\xD8\xA8\xA8\x88\x88\x88\x00' # M
+    b'\x88\x88\xC8\xA8\x98\x88\x88\x00' # N
+    b'\x70\x88\x88\x88\x88\x88\x70\x00' # O
+    b'\xF0\x88\x88\xF0\x80\x80\x80\x00' # P
+    b'\x70\x88\x88\x88\xA8\x90\x68\x00' # Q
+    b'\xF0\x88\x88\xF0\xA0\x90\x88\x00' # R
+    b'\x78\x80\x80\x70\x08\x08\xF0\x00' # S
+    b'\xF8\x20\x20\x20\x20\x20\x20\x00' # T
+    b'\x88\x88\x88\x88\x88\x88\x70\x00' # U
+    b'\x88\x88\x88\x88\x88\x50\x20\x00' # V
+    b'\x88\x88\x88\xA8\xA8\xA8\x50\x00' # W
+    b'\x88\x88\x50\x20\x50\x88\x88\x00' # X
+    b'\x88\x88\x88\x50\x20\x20\x20\x00' # Y
+    b'\xF8\x08\x10\x20\x40\x80\xF8\x00' # Z
+    b'\x70\x40\x40\x40\x40\x40\x70\x00' # [
+    b'\x00\x80\x40\x20\x10\x08\x00\x00' # \
+    b'\x70\x10\x10\x10\x10\x10\x70\x00' # ]
+    b'\x20\x50\x88\x00\x00\x00\x00\x00' # ^
+    b'\x00\x00\x00\x00\x00\x00\x00\xF8' # _
+    b'\x40\x20\x10\x00\x00\x00\x00\x00' # `
+    b'\x00\x00\x70\x08\x78\x88\x78\x00' # a
+    b'\x80\x80\xB0\xC8\x88\x88\xF0\x00' # b
+    b'\x00\x00\x70\x80\x80\x88\x70\x00' # c
+    b'\x08\x08\x68\x98\x88\x88\x78\x00' # d
+    b'\x00\x00\x70\x88\xF8\x80\x70\x00' # e
+    b'\x30\x48\x40\xE0\x40\x40\x40\x00' # f
+    b'\x00\x00\x78\x88\x88\x78\x08\x70' # g
+    b'\x80\x80\xB0\xC8\x88\x88\x88\x00' # h
+    b'\x20\x00\x60\x20\x20\x20\x70\x00' # i
+    b'\x10\x00\x30\x10\x10\x10\x90\x60' # j
+    b'\x80\x80\x90\xA0\xC0\xA0\x90\x00' # k
+    b'\x60\x20\x20\x20\x20\x20\x70\x00' # l
+    b'\x00\x00\xD0\xA8\xA8\x88\x88\x00' # m
+    b'\x00\x00\xB0\xC8\x88\x88\x88\x00' # n
+    b'\x00\x00\x70\x88\x88\x88\x70\x00' # o
+    b'\x00\x00\xF0\x88\x88\xF0\x80\x80' # p
+    b'\x00\x00\x78\x88\x88\x78\x08\x08' # q
+    b'\x00\x00\xB0\xC8\x80\x80\x80\x00' # r
+    b'\x00\x00\x70\x80\x70\x08\xF0\x00' # s
+    b'\x40\x40\xE0\x40\x40\x48\x30\x00' # t
+    b'\x00\x00\x88\x88\x88\x98\x68\x00' # u
+    b'\x00\x00\x88\x88\x88\x50\x20\x00' # v
+    b'\x00\x00\x88\x88\xA8\xA8\x50\x00' # w
+    b'\x00\x00\x88\x50\x20\x50\x88\x00' # x
+    b'\x00\x00\x88\x88\x88\x78\x08\x70' # y
+    b'\x00\x00\xF8\x10\x20\x40\xF8\x00' # z
+    b'\x10\x20\x20\x40\x20\x20\x10\x00' # {
+    b'\x20\x20\x20\x20\x20\x20\x20\x00' # |
+    b'\x40\x20\x20\x10\x20\x20\x40\x00' # }
+    b'\x00\x00\x40\xA8\x10\x00\x00\x00' # ~
+)
+
+# the built-in font, 6 pixels per character, unknown characters are drawn as '?'
+class Font:
+    height = 8
+
+    def glyph(self, ch):
+        c = ord(ch) - 32
+        if c < 0 or c > 94:
+            c = 31 # '?'
+        return FONT5X8, c << 3, 5, 6
+
+    def kern(self, a, b):
+        return 0
+
+FONT = Font()
+
+# framebuf's 8x8 font as a font here, so text laid out for FrameBuffer.text can go
+# through draw_text and textcache; each glyph is rendered once with framebuf and kept
+class FramebufFont:
+    height = 8
+
+    def __init__(self):
+        import framebuf
+        self._buf = bytearray(8)
+        self._fb = framebuf.FrameBuffer(self._buf, 8, 8, framebuf.MONO_HLSB)
+        self._glyphs = {}
+
+    def glyph(self, ch):
+        g = self._glyphs.get(ch)
+        if g is None:
+            self._fb.fill(0)
+            self._fb.text(ch, 0, 0, 1)
+            g = self._glyphs[ch] = (bytes(self._buf), 0, 8, 8)
+        return g
+
+    def kern(self, a, b):
+        return 0
+
+PACK_GLYPHS = const(32) # glyphs a GlyphPack keeps in RAM
+
+# A glyph pack built by tools/font_compile.py, read from a file opened 'rb' (or a path)
+# as glyphs are needed. The index and kerning table stay in the file and are binary
+# searched with seeks, so RAM holds only the glyphs in use, up to cache of them.
+class GlyphPack:
+    def __init__(self, f, cache=PACK_GLYPHS):
+        if isinstance(f, str):
+            f = open(f, 'rb')
+        self._f = f
+        head = f.read(12)
+        if len(head) < 12 or head[:4] != b'EPF1':
+            raise ValueError('not a glyph pack')
+        self.height = head[4]
+        self.baseline = head[5] # rows above the baseline
+        self._count = head[8] | head[9] << 8
+        self._pairs = head[10] | head[11] << 8
+        self._index = 12
+        self._kerning = 12 + self._count * 10
+        self._bitmaps = self._kerning + self._pairs * 5
+        self._entry = bytearray(10)
+        self._pair = bytearray(5)
+        self._glyphs = {}
+        self._cache = cache
+        self._missing = self._load(ord('?')) or (b'', 0, 0, self.height // 2)
+
+    def close(self):
+        self._f.close()
+
+    # the index entry of codepoint cp in self._entry, False if there is none
+    def _find(self, cp):
+        f = self._f
+        e = self._entry
+        lo = 0
+        hi = self._count - 1
+        while lo <= hi:
+            mid = (lo + hi) >> 1
+            f.seek(self._index + mid * 10)
+            f.readinto(e)
+            key = e[0] | e[1] << 8
+            if key == cp:
+                return True
+            if key < cp:
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        return False
+
+    def _load(self, cp):
+        if cp > 0xFFFF or not self._find(cp):
+            return None
+        e = self._entry
+        offset = e[2] | e[3] << 8 | e[4] << 16 | e[5] << 24
+        width = e[6]
+        gs = (width + 7) >> 3
+        data = bytearray(self.height * gs)
+        if e[9]:
+            self._f.seek(self._bitmaps + offset)
+            self._f.readinto(memoryview(data)[e[8] * gs:(e[8] + e[9]) * gs])
+        return data, 0, width, e[7]
+
+    def glyph(self, ch):
+        g = self._glyphs.get(ch)
+        if g is None:
+            g = self._load(ord(ch)) or self._missing
+            if len(self._glyphs) >= self._cache:
+                self._glyphs.clear()
+            self._glyphs[ch] = g
+        return g
+
+    def kern(self, a, b):
+        if not self._pairs:
+            return 0
+        f = self._f
+        p = self._pair
+        key = ord(a) << 16 | ord(b)
+        lo = 0
+        hi = self._pairs - 1
+        while lo <= hi:
+            mid = (lo + hi) >> 1
+            f.seek(self._kerning + mid * 5)
+            f.readinto(p)
+            k = (p[0] | p[1] << 8) << 16 | p[2] | p[3] << 8
+            if k == key:
+                return p[4] - 256 if p[4] > 127 else p[4]
+            if k < key:
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        return 0
+
+# the width in pixels text would take
+def text_width(text, font=FONT):
+    pos = 0
+    prev = None
+    for ch in text:
+        if prev is not None:
+            pos += font.kern(prev, ch)
+        pos += font.glyph(ch)[3]
+        prev = ch
+    return pos
+
+# the width and the pixel extent of text: the advances added up, and how far right its
+# last pixels can reach, which may be further
+def text_extent(text, font=FONT):
+    pos = 0
+    right = 0
+    prev = None
+    for ch in text:
+        if prev is not None:
+            pos = max(pos + font.kern(prev, ch), 0)
+        g = font.glyph(ch)
+        right = max(right, pos + g[2])
+        pos += g[3]
+        prev = ch
+    return pos, max(pos, right)
+
+# draw a w x h MONO_HLSB mask, rows of (w + 7) // 8 bytes, at x, y into a buffer of
+# width x height: set bits of the mask become bit, the rest of the buffer is left alone
+def blit_mask(buf, width, height, x, y, mask, w, h, bit=0):
+    if w <= 0 or x >= width or x + w <= 0 or y >= height or y + h <= 0:
+        return
+    gs = (w + 7) >> 3
+    stride = (width + 7) >> 3
+    first = x >> 3
+    sh = x & 7
+    nbytes = (sh + (gs << 3) + 7) >> 3
+    k0 = max(0, -first)
+    k1 = min(nbytes, stride - first)
+    tail = (0xFF00 >> (((width - 1) & 7) + 1)) & 0xFF
+    for r in range(max(0, -y), min(h, height - y)):
+        g = r * gs
+        i = (y + r) * stride + first
+        if sh:
+            line = int.from_bytes(mask[g:g + gs], 'big') << ((nbytes << 3) - sh - (gs << 3))
+        for k in range(k0, k1):
+            if sh:
+                m = (line >> ((nbytes - 1 - k) << 3)) & 0xFF
+            else:
+                m = mask[g + k]
+            if first + k == stride - 1:
+                m &= tail
+            if m:
+                if bit:
+                    buf[i + k] |= m
+                else:
+                    buf[i + k] &= ~m
+
+# draw text with its top left corner at x, y into a MONO_HLSB buffer of width x height
+# glyph pixels are set to bit, the background is left as it is
+# each row of the text is built as one integer and written a byte at a time, so the cost
+# follows the text, and when x and every glyph are byte aligned the glyph bytes go
+# straight into the buffer
+def draw_text(buf, width, height, x, y, text, font=FONT, bit=0):
+    glyphs = []
+    pos = 0
+    right = 0 # bits in a row, the last glyph rounded up to whole bytes
+    aligned = x & 7 == 0
+    prev = None
+    for ch in text:
+        if prev is not None:
+            pos = max(pos + font.kern(prev, ch), 0)
+        data, o, w, advance = font.glyph(ch)
+        bw = (w + 7) & ~7
+        glyphs.append((data, o, bw >> 3, pos))
+        right = max(right, pos + bw)
+        if pos & 7 or w != bw:
+            aligned = False
+        pos += advance
+        prev = ch
+    if not glyphs or x >= width or x + right <= 0 or y >= height or y + font.height <= 0:
+        return
+    stride = (width + 7) >> 3
+    first = x >> 3
+    tail = (0xFF00 >> (((width - 1) & 7) + 1)) & 0xFF # the real pixels of a row's last byte
+    r0 = max(0, -y)
+    r1 = min(font.height, height - y)
+
+    if aligned:
+        for data, o, gs, p in glyphs:
+            b = first + (p >> 3)
+            k0 = max(0, -b)
+            k1 = min(gs, stride - b)
+            for r in range(r0, r1):
+                i = (y + r) * stride + b
+                g = o + r * gs
+                for k in range(k0, k1):
+                    m = data[g + k]
+                    if b + k == stride - 1:
+                        m &= tail
+                    if bit:
+                        buf[i + k] |= m
+                    else:
+                        buf[i + k] &= ~m
+        return
+
+    sh = x & 7
+    nbytes = (sh + right + 7) >> 3
+    k0 = max(0, -first)
+    k1 = min(nbytes, stride - first)
+    for r in range(r0, r1):
+        line = 0
+        for data, o, gs, p in glyphs:
+            g = o + r * gs
+            row = data[g] if gs == 1 else int.from_bytes(data[g:g + gs], 'big')
+            if row:
+                line |= row << (right - p - (gs << 3))
+        if not line:
+            continue
+        line <<= (nbytes << 3) - sh - right
+        i = (y + r) * stride + first
+        for k in range(k0, k1):
+            m = (line >> ((nbytes - 1 - k) << 3)) & 0xFF
+            if first + k == stride - 1:
+                m &= tail
+            if m:
+                if bit:
+                    buf[i + k] |= m
+                else:
+                    buf[i + k] &= ~m
@@ -0,0 +1,380 @@
+"""
+MicroPython Waveshare e-paper display SPI interface, shared by the drivers
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from micropython import const
+from time import sleep_ms, ticks_ms, ticks_diff, ticks_add
+
+FILL_CHUNK = const(64) # default bytes per write when streaming a fill
+
+# init script step flags, or'd into the parameter count byte
+INIT_WAIT  = const(0x80) # wait until idle after the command
+INIT_DELAY = const(0x40) # a delay byte (ms) follows the parameters
+INIT_COUNT = const(0x3F) # up to 63 parameter bytes per command
+
+SEND_CHUNK = const(1024) # bytes per write when streaming a plane, the async API yields between them
+
+WAIT_IDLE  = const(-1)    # step: wait until the panel is idle, any other step is a delay in ms
+REFRESH    = const(-2)    # step: the refresh has been triggered, start_refresh returns here
+POLL_MS    = const(10)    # longest sleep between busy polls
+TIMEOUT_MS = const(60000) # give up on a busy panel after this long
+
+# Every buffer used while talking to the panel is allocated here, up front,
+# so commands, parameters and fills don't create garbage mid transfer
+class EPDIF:
+    def __init__(self, spi, cs, dc, rst, busy, busy_level, fill_chunk=FILL_CHUNK):
+        self.spi = spi
+        self.cs = cs
+        self.dc = dc
+        self.rst = rst
+        self.busy = busy
+        self.cs.init(self.cs.OUT, value=1)
+        self.dc.init(self.dc.OUT, value=0)
+        self.rst.init(self.rst.OUT, value=0)
+        self.busy.init(self.busy.IN)
+        self._cmd = bytearray(1)
+        self._args = bytearray(4)
+        args = memoryview(self._args)
+        self._argv = (None, args[:1], args[:2], args[:3], args[:4])
+        self._chunk = bytearray(fill_chunk)
+        self._busy_level = busy_level
+        self._woken = False
+        self._idle = None
+        self.poll_ms = POLL_MS
+        self.timeout_ms = TIMEOUT_MS
+        self.busy_ms = 0 # duration of the last wait_until_idle
+        self._pending = None # rest of a refresh started by start_refresh
+        self._due = 0
+        self._waiting = False
+
+    # poll_ms caps the sleep between busy polls, timeout_ms bounds each wait
+    # with irq=True the wait sleeps in machine.idle() until the busy pin edges to idle
+    # ports without pin interrupts keep polling
+    def set_busy_wait(self, poll_ms=POLL_MS, timeout_ms=TIMEOUT_MS, irq=False):
+        self.poll_ms = max(1, poll_ms)
+        self.timeout_ms = timeout_ms
+        busy = self.busy
+        if self._idle is not None:
+            busy.irq(handler=None)
+            self._idle = None
+        if irq and hasattr(busy, 'irq'):
+            from machine import idle
+            busy.irq(handler=self._wake,
+                     trigger=busy.IRQ_RISING if self._busy_level == 0 else busy.IRQ_FALLING)
+            self._idle = idle
+
+    def _wake(self, pin):
+        self._woken = True
+
+    # init, display_frame and sleep are written once, as generators of steps (_init,
+    # _display_frame, _sleep), and driven either by blocking sleeps or by the event loop
+    def init(self):
+        self._run(self._init())
+
+    def display_frame(self, *args, **kwargs):
+        self._run(self._display_frame(*args, **kwargs))
+
+    def sleep(self):
+        self._run(self._sleep())
+
+    async def init_async(self):
+        await self._run_async(self._init())
+
+    async def display_frame_async(self, *args, **kwargs):
+        await self._run_async(self._display_frame(*args, **kwargs))
+
+    async def sleep_async(self):
+        await self._run_async(self._sleep())
+
+    # split-phase display_frame: send the frame, trigger the refresh and return
+    # while the panel is still refreshing, to overlap it with other work
+    def start_refresh(self, *args, **kwargs):
+        self._run(self._display_frame(*args, **kwargs), True)
+
+    # True while a refresh is running, steps through the rest of it without blocking
+    def is_busy(self):
+        steps = self._pending
+        while steps is not None:
+            if ticks_diff(self._due, ticks_ms()) > 0:
+                return True
+            if self._waiting:
+                if self.busy.value() == self._busy_level:
+                    return True
+                self._waiting = False
+            # the rest of the refresh may send commands, which must not wait on itself
+            self._pending = None
+            try:
+                ms = next(steps)
+            except StopIteration:
+                steps = None
+                break
+            self._pending = steps
+            if ms == WAIT_IDLE:
+                self._waiting = True
+            elif ms > 0:
+                self._due = ticks_add(ticks_ms(), ms)
+        return self.busy.value() == self._busy_level
+
+    # block until a refresh from start_refresh completes, if it hasn't already
+    # every operation calls this first, and so does every command or data write, so
+    # nothing reaches the panel while it is refreshing
+    def finish(self):
+        steps = self._pending
+        if steps is not None:
+            self._pending = None
+            ms = ticks_diff(self._due, ticks_ms())
+            if ms > 0:
+                sleep_ms(ms)
+            if self._waiting:
+                self.wait_until_idle()
+            self._run(steps)
+
+    async def finish_async(self):
+        steps = self._pending
+        if steps is not None:
+            self._pending = None
+            import uasyncio as asyncio
+            ms = ticks_diff(self._due, ticks_ms())
+            if ms > 0:
+                await asyncio.sleep_ms(ms)
+            if self._waiting:
+                await self.wait_until_idle_async()
+            await self._run_async(steps)
+
+    def _run(self, steps, start=False):
+        self.finish()
+        for ms in steps:
+            if ms == WAIT_IDLE:
+                self.wait_until_idle()
+            elif ms == REFRESH:
+                if start:
+                    self._pending = steps
+                    self._due = ticks_ms()
+                    self._waiting = False
+                    return
+            elif ms:
+                sleep_ms(ms)
+
+    # every step returns to the event loop, including the zero delays between transfer chunks
+    async def _run_async(self, steps):
+        import uasyncio as asyncio
+        await self.finish_async()
+        for ms in steps:
+            if ms == WAIT_IDLE:
+                await self.wait_until_idle_async()
+            elif ms != REFRESH:
+                await asyncio.sleep_ms(ms)
+
+    # block until the panel is idle, raises RuntimeError after timeout_ms
+    # polls start at 1 ms and back off to poll_ms, so short waits return quickly
+    def wait_until_idle(self):
+        busy = self.busy
+        level = self._busy_level
+        start = ticks_ms()
+        self._woken = False
+        idle = self._idle
+        delay = 1
+        while busy.value() == level and not self._woken:
+            if ticks_diff(ticks_ms(), start) >= self.timeout_ms:
+                self.busy_ms = ticks_diff(ticks_ms(), start)
+                raise RuntimeError('EPD busy timeout')
+            if idle is not None:
+                idle()
+            else:
+                sleep_ms(delay)
+                if delay < self.poll_ms:
+                    delay = min(delay << 1, self.poll_ms)
+        self.busy_ms = ticks_diff(ticks_ms(), start)
+
+    # as wait_until_idle, but sleeps in the event loop between polls
+    # an irq wakeup is noticed on the next poll
+    async def wait_until_idle_async(self):
+        import uasyncio as asyncio
+        busy = self.busy
+        level = self._busy_level
+        start = ticks_ms()
+        self._woken = False
+        delay = 1
+        while busy.value() == level and not self._woken:
+            if ticks_diff(ticks_ms(), start) >= self.timeout_ms:
+                self.busy_ms = ticks_diff(ticks_ms(), start)
+                raise RuntimeError('EPD busy timeout')
+            await asyncio.sleep_ms(delay)
+            if delay < self.poll_ms:
+                delay = min(delay << 1, self.poll_ms)
+        self.busy_ms = ticks_diff(ticks_ms(), start)
+
+    def reset(self):
+        self._run(self._reset())
+
+    def _reset(self):
+        self.rst(0)
+        yield 200
+        self.rst(1)
+        yield 200
+
+    # command byte and its parameters share one CS window
+    def _command(self, command, data=None):
+        if self._pending is not None:
+            self.finish()
+        self._cmd[0] = command
+        self.dc(0)
+        self.cs(0)
+        self.spi.write(self._cmd)
+        if data is not None:
+            self.dc(1)
+            self.spi.write(data)
+        self.cs(1)
+
+    # command with up to 4 parameter bytes, packed into the preallocated buffer
+    def _command_args(self, command, count, a=0, b=0, c=0, d=0):
+        args = self._args
+        args[0] = a
+        args[1] = b
+        args[2] = c
+        args[3] = d
+        self._command(command, self._argv[count])
+
+    # replay an init script, stored as one immutable bytes object per driver
+    # each step is: command, parameter count | INIT_WAIT | INIT_DELAY, parameters[, delay ms]
+    def _script(self, script):
+        script = memoryview(script)
+        i = 0
+        end = len(script)
+        while i < end:
+            command = script[i]
+            flags = script[i + 1]
+            count = flags & INIT_COUNT
+            i += 2
+            self._command(command, script[i:i + count] if count else None)
+            i += count
+            if flags & INIT_DELAY:
+                yield script[i]
+                i += 1
+            if flags & INIT_WAIT:
+                yield WAIT_IDLE
+
+    def _data(self, data):
+        if self._pending is not None:
+            self.finish()
+        self.dc(1)
+        self.cs(0)
+        self.spi.write(data)
+        self.cs(1)
+
+    # write size bytes of a plane as data, releasing CS and yielding between writes
+    # data is a buffer of at least size bytes, sent in SEND_CHUNK slices, or an iterable of
+    # chunks (bytes, bytearray, memoryview) adding up to exactly size bytes, sent as they come
+    def _send(self, data, size):
+        try:
+            data = memoryview(data)
+        except TypeError:
+            sent = 0
+            for chunk in data:
+                n = len(chunk)
+                if sent + n > size:
+                    raise ValueError('plane larger than the panel')
+                if n:
+                    self._data(chunk)
+                    sent += n
+                    yield 0
+            if sent < size:
+                raise ValueError('plane smaller than the panel')
+            return
+        if len(data) < size:
+            raise ValueError('plane smaller than the panel')
+        for i in range(0, size, SEND_CHUNK):
+            self._data(data[i:min(i + SEND_CHUNK, size)])
+            yield 0
+
+    # raise ValueError for a buffer shorter than size, call before the first command so a
+    # bad plane sends nothing; None and iterables of chunks pass, _send counts those as they go
+    def _check(self, data, size):
+        try:
+            n = len(memoryview(data))
+        except TypeError:
+            return
+        if n < size:
+            raise ValueError('plane smaller than the panel')
+
+    # a plane as count rows of stride bytes for the row converters, returns (source, offsets)
+    # buffers are read in place, iterables of chunks are gathered a row at a time into one line
+    def _rows(self, data, stride, count):
+        try:
+            size = len(memoryview(data))
+        except TypeError:
+            line = bytearray(stride)
+            return line, self._gather(iter(data), stride, count, line)
+        if size < stride * count:
+            raise ValueError('plane smaller than the panel')
+        return data, iter(range(0, stride * count, stride))
+
+    def _gather(self, chunks, stride, count, line):
+        chunk = b''
+        pos = 0
+        for y in range(count):
+            filled = 0
+            while filled < stride:
+                if pos == len(chunk):
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        raise ValueError('plane smaller than the panel')
+                    pos = 0
+                    continue
+                n = min(stride - filled, len(chunk) - pos)
+                line[filled:filled + n] = memoryview(chunk)[pos:pos + n]
+                filled += n
+                pos += n
+            yield 0
+        if pos < len(chunk) or any(len(c) for c in chunks):
+            raise ValueError('plane larger than the panel')
+
+    # stream count bytes of a repeating pattern in one transaction, reusing a small chunk
+    # pattern is a byte value or a short sequence of bytes
+    def _fill(self, pattern, count):
+        if self._pending is not None:
+            self.finish()
+        chunk = self._chunk
+        if isinstance(pattern, int):
+            size = len(chunk)
+            for i in range(size):
+                chunk[i] = pattern
+        else:
+            n = len(pattern)
+            size = len(chunk) // n * n
+            if size == 0:
+                raise ValueError('fill pattern longer than fill chunk')
+            for i in range(size):
+                chunk[i] = pattern[i % n]
+        part = memoryview(chunk)[:size]
+        self.dc(1)
+        self.cs(0)
+        while count >= size:
+            self.spi.write(part)
+            count -= size
+        if count > 0:
+            self.spi.write(part[:count])
+        self.cs(1)
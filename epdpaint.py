@@ -0,0 +1,326 @@
+"""
+MicroPython Waveshare e-paper drawing on 1bpp frame buffers, shared by the (B) drivers
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from micropython import const
+from epdfont import draw_text, FONT
+
+_ROTATE_90  = const(1)
+_ROTATE_180 = const(2)
+_ROTATE_270 = const(3)
+
+# bit order reversal of a byte, for 180 degree rows
+def _reverse_table():
+    table = bytearray(256)
+    for i in range(256):
+        r = 0
+        for bit in range(8):
+            if i & (1 << bit):
+                r |= 0x80 >> bit
+        table[i] = r
+    return table
+
+REVERSE = _reverse_table()
+
+# Drawing methods for drivers that paint into their own frame buffers. Everything is
+# built on _fill_rect, which clips a rectangle to the buffer and writes it a row at a time
+# as a masked first byte, a slice of whole bytes and a masked last byte, so each byte
+# is touched once. Lines and circles are decomposed into one span per row.
+# Rotation is applied while the frame is sent, not while it is drawn: after set_rotate the
+# buffer is width x height in the rotated orientation, rows of (width + 7) // 8 bytes,
+# and _rotated turns it into panel rows on the way out.
+# The driver provides width, height, rotate and COLORED, the bit value of a coloured pixel.
+class Paint:
+    _spans = None # a row of 0x00 and a row of 0xFF, for the middle of each span
+    _band = None  # 8 panel rows, built by _rotated
+    text_cache = None # a textcache.TextCache for draw_string_at to reuse rendered strings
+
+    def set_rotate(self, rotate):
+        if (rotate & 1) != (self.rotate & 1):
+            self.width, self.height = self.height, self.width
+        self.rotate = rotate
+
+    # panel width and height, whatever the rotation
+    def _panel(self):
+        if self.rotate & 1:
+            return self.height, self.width
+        return self.width, self.height
+
+    def set_pixel(self, frame_buffer, x, y, colored):
+        if (x < 0 or x >= self.width or y < 0 or y >= self.height):
+            return
+        self._set_pixel(frame_buffer, x, y, colored)
+
+    # x, y in the buffer, which is drawn as the rotation has it and turned while it is sent
+    def set_absolute_pixel(self, frame_buffer, x, y, colored):
+        if (x < 0 or x >= self.width or y < 0 or y >= self.height):
+            return
+        self._set_pixel(frame_buffer, x, y, colored)
+
+    # for callers that clip to the buffer themselves
+    def _set_pixel(self, frame_buffer, x, y, colored):
+        bit = self.COLORED if colored else self.COLORED ^ 1
+        i = y * ((self.width + 7) >> 3) + (x >> 3)
+        if bit:
+            frame_buffer[i] |= 0x80 >> (x & 7)
+        else:
+            frame_buffer[i] &= ~(0x80 >> (x & 7))
+
+    # fill a w x h rectangle at x, y, clipped to the buffer
+    def _fill_rect(self, frame_buffer, x, y, w, h, colored):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width) - 1
+        y1 = min(y + h, self.height) - 1
+        if x0 > x1 or y0 > y1:
+            return
+        stride = (self.width + 7) >> 3
+        b0 = x0 >> 3
+        b1 = x1 >> 3
+        first = 0xFF >> (x0 & 7)
+        last = (0xFF00 >> ((x1 & 7) + 1)) & 0xFF
+        if b0 == b1:
+            first &= last
+        n = b1 - b0 - 1 # whole bytes between the edges
+        spans = self._spans
+        if spans is None:
+            size = (max(self.width, self.height) + 7) >> 3
+            spans = self._spans = (bytes(size), b'\xFF' * size)
+        bit = self.COLORED if colored else self.COLORED ^ 1
+        middle = memoryview(spans[bit])[:max(n, 0)]
+        i = y0 * stride + b0
+        for _ in range(y1 - y0 + 1):
+            if bit:
+                frame_buffer[i] |= first
+            else:
+                frame_buffer[i] &= ~first
+            if b1 > b0:
+                if n:
+                    frame_buffer[i + 1:i + 1 + n] = middle
+                if bit:
+                    frame_buffer[i + 1 + n] |= last
+                else:
+                    frame_buffer[i + 1 + n] &= ~last
+            i += stride
+
+    # a plane drawn in the rotated orientation, as panel rows for _send or _rows
+    # returned as is when not rotated, otherwise an iterable of 8 row bands
+    def _rotated(self, frame_buffer):
+        if frame_buffer is None or not self.rotate:
+            return frame_buffer
+        try:
+            src = memoryview(frame_buffer)
+        except TypeError:
+            raise ValueError('a rotated plane must be a buffer')
+        if len(src) < ((self.width + 7) >> 3) * self.height:
+            raise ValueError('plane smaller than the panel')
+        return self._rotate_rows(src)
+
+    def _rotate_rows(self, src):
+        w = self.width
+        stride = (w + 7) >> 3
+        pw, ph = self._panel()
+        pstride = pw >> 3
+        band = self._band
+        if band is None:
+            band = self._band = bytearray(8 * pstride)
+        if self.rotate == _ROTATE_180:
+            # panel row y is buffer row ph - 1 - y, mirrored: bytes reversed, bits reversed
+            rev = REVERSE
+            row = memoryview(band)[:pstride]
+            o = ph * stride - 1
+            for _ in range(ph):
+                for j in range(pstride):
+                    band[j] = rev[src[o - j]]
+                yield row
+                o -= stride
+            return
+        # 90 and 270: 8 panel rows are one byte column of the buffer, and each 8x8 block
+        # of it is transposed into byte j of those rows
+        # 90: panel (px, py) is buffer (py, pw - 1 - px), byte j reads rows pw - 1 - 8j down
+        # 270: panel (px, py) is buffer (ph - 1 - py, px), byte j reads rows 8j up
+        r90 = self.rotate == _ROTATE_90
+        out = memoryview(band)
+        for n in range(stride):
+            bx = n if r90 else stride - 1 - n
+            count = min(8, w - (bx << 3)) # columns in this byte, the last may be short
+            for j in range(pstride):
+                if r90:
+                    o = (pw - 1 - (j << 3)) * stride + bx
+                    step = -stride
+                else:
+                    o = (j << 3) * stride + bx
+                    step = stride
+                # transpose8 (Hacker's Delight) on two 32 bit halves
+                x = src[o] << 24 | src[o + step] << 16 | src[o + 2 * step] << 8 | src[o + 3 * step]
+                o += 4 * step
+                y = src[o] << 24 | src[o + step] << 16 | src[o + 2 * step] << 8 | src[o + 3 * step]
+                t = (x ^ (x >> 7)) & 0x00AA00AA
+                x = x ^ t ^ (t << 7)
+                t = (y ^ (y >> 7)) & 0x00AA00AA
+                y = y ^ t ^ (t << 7)
+                t = (x ^ (x >> 14)) & 0x0000CCCC
+                x = x ^ t ^ (t << 14)
+                t = (y ^ (y >> 14)) & 0x0000CCCC
+                y = y ^ t ^ (t << 14)
+                t = (x & 0xF0F0F0F0) | ((y >> 4) & 0x0F0F0F0F)
+                y = ((x << 4) & 0xF0F0F0F0) | (y & 0x0F0F0F0F)
+                # byte i of t:y is column 8bx + i, at band row i for 90, count - 1 - i for 270
+                if r90:
+                    i = j
+                    d = pstride
+                else:
+                    i = (count - 1) * pstride + j
+                    d = -pstride
+                for k in range(count):
+                    band[i] = (t >> (24 - (k << 3)) if k < 4 else y >> (56 - (k << 3))) & 0xFF
+                    i += d
+            yield out[:count * pstride]
+
+    # text in an epdfont font, the built-in 5x8 one when font is None
+    # only the pixels of the glyphs are set, in the buffer's orientation like everything else
+    def draw_string_at(self, frame_buffer, x, y, text, font, colored):
+        font = FONT if font is None else font
+        bit = self.COLORED if colored else self.COLORED ^ 1
+        if self.text_cache is not None:
+            self.text_cache.draw(frame_buffer, self.width, self.height, x, y, text, font, bit)
+        else:
+            draw_text(frame_buffer, self.width, self.height, x, y, text, font, bit)
+
+    # thickness widens the line vertically for shallow lines and horizontally for steep ones
+    def draw_line(self, frame_buffer, x0, y0, x1, y1, colored, thickness=1):
+        a = (thickness - 1) // 2 # brush pixels before the line
+        b = thickness - 1 - a    # and after it
+        if abs(x1 - x0) >= abs(y1 - y0):
+            if x1 < x0:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            dx = x1 - x0
+            ady = abs(y1 - y0)
+            if ady == 0:
+                self._fill_rect(frame_buffer, x0, y0 - a, dx + 1, thickness, colored)
+                return
+            sy = 1 if y1 > y0 else -1
+            # step k of the line, at row y0 + k * sy, spans columns x0 + start(k) .. x0 + end(k)
+            # of the rounded line, and row p takes the steps whose brush reaches it
+            for p in range(min(y0, y1) - max(a, b), max(y0, y1) + max(a, b) + 1):
+                if sy > 0:
+                    lo = p - y0 - b
+                    hi = p - y0 + a
+                else:
+                    lo = y0 - p - a
+                    hi = y0 - p + b
+                lo = max(lo, 0)
+                hi = min(hi, ady)
+                if lo > hi:
+                    continue
+                start = max(-((dx - 2 * lo * dx) // (2 * ady)), 0)
+                end = min(-((-(2 * hi + 1) * dx) // (2 * ady)) - 1, dx)
+                self._fill_rect(frame_buffer, x0 + start, p, end - start + 1, 1, colored)
+        else:
+            if y1 < y0:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            dy = y1 - y0
+            adx = abs(x1 - x0)
+            sx = 1 if x1 > x0 else -1
+            if adx == 0:
+                self._fill_rect(frame_buffer, x0 - a, y0, thickness, dy + 1, colored)
+                return
+            for j in range(dy + 1):
+                x = x0 + sx * ((2 * j * adx + dy) // (2 * dy))
+                self._fill_rect(frame_buffer, x - a, y0 + j, thickness, 1, colored)
+
+    def draw_horizontal_line(self, frame_buffer, x, y, width, colored):
+        self._fill_rect(frame_buffer, x, y, width, 1, colored)
+
+    def draw_vertical_line(self, frame_buffer, x, y, height, colored):
+        self._fill_rect(frame_buffer, x, y, 1, height, colored)
+
+    def draw_rectangle(self, frame_buffer, x0, y0, x1, y1, colored):
+        min_x = x0 if x1 > x0 else x1
+        max_x = x1 if x1 > x0 else x0
+        min_y = y0 if y1 > y0 else y1
+        max_y = y1 if y1 > y0 else y0
+        self.draw_horizontal_line(frame_buffer, min_x, min_y, max_x - min_x + 1, colored)
+        self.draw_horizontal_line(frame_buffer, min_x, max_y, max_x - min_x + 1, colored)
+        self.draw_vertical_line(frame_buffer, min_x, min_y, max_y - min_y + 1, colored)
+        self.draw_vertical_line(frame_buffer, max_x, min_y, max_y - min_y + 1, colored)
+
+    def draw_filled_rectangle(self, frame_buffer, x0, y0, x1, y1, colored):
+        min_x = x0 if x1 > x0 else x1
+        max_x = x1 if x1 > x0 else x0
+        min_y = y0 if y1 > y0 else y1
+        max_y = y1 if y1 > y0 else y0
+        self._fill_rect(frame_buffer, min_x, min_y, max_x - min_x + 1, max_y - min_y + 1, colored)
+
+    def draw_circle(self, frame_buffer, x, y, radius, colored):
+        # Bresenham algorithm
+        x_pos = -radius
+        y_pos = 0
+        err = 2 - 2 * radius
+        if (x >= self.width or y >= self.height):
+            return
+        while True:
+            self.set_pixel(frame_buffer, x - x_pos, y + y_pos, colored)
+            self.set_pixel(frame_buffer, x + x_pos, y + y_pos, colored)
+            self.set_pixel(frame_buffer, x + x_pos, y - y_pos, colored)
+            self.set_pixel(frame_buffer, x - x_pos, y - y_pos, colored)
+            e2 = err
+            if (e2 <= y_pos):
+                y_pos += 1
+                err += y_pos * 2 + 1
+                if(-x_pos == y_pos and e2 <= x_pos):
+                    e2 = 0
+            if (e2 > x_pos):
+                x_pos += 1
+                err += x_pos * 2 + 1
+            if x_pos > 0:
+                break
+
+    def draw_filled_circle(self, frame_buffer, x, y, radius, colored):
+        # Bresenham algorithm, one span per row, taken the first and widest time the row comes up
+        x_pos = -radius
+        y_pos = 0
+        err = 2 - 2 * radius
+        if (x >= self.width or y >= self.height):
+            return
+        last = -1
+        while True:
+            if y_pos != last:
+                self._fill_rect(frame_buffer, x + x_pos, y + y_pos, 2 * (-x_pos) + 1, 1, colored)
+                if y_pos:
+                    self._fill_rect(frame_buffer, x + x_pos, y - y_pos, 2 * (-x_pos) + 1, 1, colored)
+                last = y_pos
+            e2 = err
+            if (e2 <= y_pos):
+                y_pos += 1
+                err += y_pos * 2 + 1
+                if(-x_pos == y_pos and e2 <= x_pos):
+                    e2 = 0
+            if (e2 > x_pos):
+                x_pos += 1
+                err += x_pos * 2 + 1
+            if x_pos > 0:
+                break
@@ -0,0 +1,113 @@
+"""
+MicroPython Waveshare e-paper partial window refresh, shared by the IL0373 and IL0398 drivers
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from micropython import const
+from epdif import WAIT_IDLE, REFRESH
+
+# Display Commands
+DATA_START_TRANSMISSION_1 = const(0x10)
+DISPLAY_REFRESH           = const(0x12)
+DATA_START_TRANSMISSION_2 = const(0x13)
+PARTIAL_WINDOW            = const(0x90)
+PARTIAL_IN                = const(0x91)
+PARTIAL_OUT               = const(0x92)
+
+# Refreshes one window of a two plane panel with PARTIAL_IN/PARTIAL_WINDOW, sending only
+# the window's bytes. The driver provides width, height and _window, a bytearray for the
+# PARTIAL_WINDOW parameters whose length picks the layout: 9 bytes with 16 bit x on the
+# IL0398 (4.2"), 7 bytes with 8 bit x on the IL0373. Listed after Paint in the bases, so
+# Paint's _panel wins on the drivers that rotate.
+class PartialWindow:
+    # panel width and height
+    def _panel(self):
+        return self.width, self.height
+
+    # program the partial window, x_end | 7 so the window covers whole bytes
+    def _set_partial_window(self, x, y, x_end, y_end):
+        window = self._window
+        if len(window) == 9:
+            window[0] = x >> 8
+            window[1] = x & 0xF8
+            window[2] = x_end >> 8
+            window[3] = (x_end | 0x07) & 0xFF
+            i = 4
+        else:
+            window[0] = x & 0xF8
+            window[1] = x_end | 0x07
+            i = 2
+        window[i] = y >> 8
+        window[i + 1] = y & 0xFF
+        window[i + 2] = y_end >> 8
+        window[i + 3] = y_end & 0xFF
+        window[i + 4] = 0x01 # gates scan both inside and outside of the partial window
+        self._command(PARTIAL_WINDOW, window)
+
+    # the window clipped to the panel, as (x, y, x_end, y_end, size in bytes)
+    # x point must be the multiple of 8 or the last 3 bits will be ignored
+    def _partial_bounds(self, x, y, w, h):
+        if w < 8 or h <= 0:
+            raise ValueError('partial window smaller than 8 x 1 pixels')
+        width, height = self._panel()
+        x = x & ~7
+        w = w & ~7
+        if x < 0 or y < 0 or x >= width or y >= height:
+            raise ValueError('partial window outside the panel')
+        x_end = min(x + w, width) - 1
+        y_end = min(y + h, height) - 1
+        return x, y, x_end, y_end, ((x_end >> 3) - (x >> 3) + 1) * (y_end - y + 1)
+
+    # refresh one window, each image holds its w x h pixels in rows of w // 8 bytes
+    # only the window is sent, x and w must be multiples of 8, in panel coordinates
+    # whatever set_rotate says
+    def display_partial(self, image_black, image_red, x, y, w, h):
+        self._run(self._display_partial(image_black, image_red, x, y, w, h))
+
+    async def display_partial_async(self, image_black, image_red, x, y, w, h):
+        await self._run_async(self._display_partial(image_black, image_red, x, y, w, h))
+
+    def _display_partial(self, image_black, image_red, x, y, w, h):
+        x, y, x_end, y_end, size = self._partial_bounds(x, y, w, h)
+        self._check(image_black, size)
+        self._check(image_red, size)
+        self._command(PARTIAL_IN)
+        # a stream that runs short still raises in _send, leave partial mode anyway
+        try:
+            self._set_partial_window(x, y, x_end, y_end)
+            if (image_black != None):
+                self._command(DATA_START_TRANSMISSION_1)
+                yield 2
+                yield from self._send(image_black, size)
+                yield 2
+            if (image_red != None):
+                self._command(DATA_START_TRANSMISSION_2)
+                yield 2
+                yield from self._send(image_red, size)
+                yield 2
+            self._command(DISPLAY_REFRESH)
+            yield REFRESH
+            yield WAIT_IDLE
+        finally:
+            self._command(PARTIAL_OUT)
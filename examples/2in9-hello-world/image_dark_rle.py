@@ -0,0 +1,3 @@
+# "hello world", rotated 90 deg, black bg, white text, run-length encoded for rle.py
+# 128 x 296
+hello_world_dark_rle = b'RLE1\x80\x00(\x01\xff\x00\xff\x00\xff\x00\x80\x00\x00\x02\x8d\x00\x00\x07\x82\xff\x00\xf0\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x07\x82\xff\x00\xf0\x8a\x00\x01\x1f\xc0\x8c\x00\x01\x07\xe0\x8c\x00\x01\x03\xf0\x8c\x00\x01\x01\xf8\x8d\x00\x00\xfc\x8d\x00\x00|\x8d\x00\x00>\x8d\x00\x00>\x8d\x00\x00>\x8d\x00\x00>\x8d\x00\x00~\x8b\x00\x02\x7f\xff\xfe\x8a\x00\x03\x07\xff\xff\xfc\x8a\x00\x03\x0f\xff\xff\xfc\x8a\x00\x03\x0f\xff\xff\xf8\x8a\x00\x03\x0f\xff\xff\xc0\x8a\x00\x01\x07\xe0\xcd\x00\x01\x0f\xf0\x8c\x00\x01\x7f\xfe\x8c\x00\x80\xff\x00\x80\x8a\x00\x03\x01\xff\xff\xe0\x8a\x00\x03\x03\xff\xff\xf0\x8a\x00\x03\x03\xf7\xdf\xf8\x8a\x00\x03\x07\xe3\xc3\xf8\x8a\x00\x03\x07\xe3\xc1\xfc\x8a\x00\x03\x07\xc1\xe0|\x8a\x00\x03\x0f\xc1\xe0~\x8a\x00\x03\x0f\x81\xf0>\x8a\x00\x03\x0f\x80\xf0>\x8a\x00\x03\x0f\x80\xf8>\x8a\x00\x03\x0f\x80x>\x8a\x00\x03\x0f\x80|>\x8a\x00\x03\x0f\x80<>\x8a\x00\x03\x0f\x80>~\x8a\x00\x03\x07\xc0?|\x8a\x00\x03\x07\xc0\x1f\xfc\x8a\x00\x03\x07\xc0\x1f\xfc\x8a\x00\x03\x03\xe0\x0f\xf8\x8a\x00\x03\x03\xf0\x07\xf0\x8a\x00\x03\x01\xf8\x03\xe0\x8b\x00\x00\xf8\x8d\x00\x00p\xfc\x00\x00\x07\x82\xff\x00\xf0\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x07\x82\xff\x00\xf0\xff\x00\x87\x00\x00\x07\x82\xff\x00\xf0\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x07\x82\xff\x00\xf0\xd9\x00\x01\x07\xf8\x8c\x00\x01?\xff\x8c\x00\x80\xff\x00\xc0\x8a\x00\x03\x01\xff\xff\xe0\x8a\x00\x03\x03\xff\xff\xf0\x8a\x00\x03\x07\xf8\x0f\xf8\x8a\x00\x03\x07\xe0\x03\xf8\x8a\x00\x03\x07\xc0\x00\xfc\x8a\x00\x03\x0f\x80\x00|\x8a\x00\x03\x0f\x80\x00~\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\xc0\x00>\x8a\x00\x03\x07\xe0\x00~\x8a\x00\x03\x07\xf0\x00\xfe\x8a\x00\x03\x03\xfc\x03\xfc\x8a\x00\x03\x01\xff\xff\xf8\x8b\x00\x80\xff\x00\xf8\x8b\x00\x02\x7f\xff\xe0\x8b\x00\x02\x1f\xff\xc0\x8b\x00\x01\x03\xfe\xff\x00\xff\x00\xcc\x00\x00\xfc\x8c\x00\x01\x7f\xfe\x8b\x00\x02\x1f\xff\xfe\x8b\x00\x80\xff\x00\xfe\x8a\x00\x03\x03\xff\xff\xfc\x8a\x00\x02\x07\xff\xff\x8b\x00\x02\x0f\xff\x80\x8b\x00\x01\x0f\xe0\x8c\x00\x01\x0f\xfc\x8c\x00\x02\x07\xff\xc0\x8b\x00\x02\x03\xff\xf8\x8c\x00\x80\xff\x00\x80\x8b\x00\x02\x1f\xff\xf0\x8b\x00\x02\x01\xff\xfc\x8c\x00\x01?\xfe\x8c\x00\x01\x03\xfe\x8b\x00\x02\x01\xff\xfe\x8b\x00\x02?\xff\xfc\x8a\x00\x03\x01\xff\xff\xe0\x8a\x00\x02\x07\xff\xfc\x8b\x00\x01\x0f\xfe\x8c\x00\x01\x0f\xc0\x8c\x00\x01\x0f\xfc\x8c\x00\x02\x0f\xff\xc0\x8b\x00\x02\x03\xff\xfc\x8b\x00\x03\x01\xff\xff\xc0\x8b\x00\x02?\xff\xfc\x8b\x00\x02\x03\xff\xfe\x8c\x00\x01?\xfe\x8c\x00\x01\x03\xfe\x8d\x00\x00<\xab\x00\x01\x07\xf8\x8c\x00\x01?\xff\x8c\x00\x80\xff\x00\xc0\x8a\x00\x03\x01\xff\xff\xe0\x8a\x00\x03\x03\xff\xff\xf0\x8a\x00\x03\x07\xf8\x0f\xf8\x8a\x00\x03\x07\xe0\x03\xf8\x8a\x00\x03\x07\xc0\x00\xfc\x8a\x00\x03\x0f\x80\x00|\x8a\x00\x03\x0f\x80\x00~\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\xc0\x00>\x8a\x00\x03\x07\xe0\x00~\x8a\x00\x03\x07\xf0\x00\xfe\x8a\x00\x03\x03\xfc\x03\xfc\x8a\x00\x03\x01\xff\xff\xf8\x8b\x00\x80\xff\x00\xf8\x8b\x00\x02\x7f\xff\xe0\x8b\x00\x02\x1f\xff\xc0\x8b\x00\x01\x03\xfe\xfb\x00\x03\x07\xff\xff\xfc\x8a\x00\x03\x0f\xff\xff\xfe\x8a\x00\x03\x0f\xff\xff\xfe\x8a\x00\x03\x0f\xff\xff\xfe\x8a\x00\x03\x07\xff\xff\xf8\x8c\x00\x01\x0f\xe0\x8c\x00\x01\x03\xf0\x8c\x00\x01\x01\xf0\x8d\x00\x00\xf8\x8d\x00\x00|\x8d\x00\x00|\x8d\x00\x00|\x8d\x00\x00>\x8d\x00\x00>\x8c\x00\x01\x07\xfe\x8c\x00\x01\x0f\xfe\x8c\x00\x01\x0f\xfe\x8c\x00\x01\x0f\xfc\x8c\x00\x01\x07\xf8\xfa\x00\x00\x07\x82\xff\x00\xf0\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x07\x82\xff\x00\xf0\xc9\x00\x01\x07\xf8\x8c\x00\x01?\xff\x8c\x00\x02\x7f\xff\xc0\x8a\x00\x03\x01\xff\xff\xe0\x8a\x00\x03\x01\xff\xff\xf0\x8a\x00\x03\x03\xfc\x07\xf8\x8a\x00\x03\x07\xf0\x01\xfc\x8a\x00\x03\x07\xe0\x00\xfc\x8a\x00\x03\x0f\xc0\x00|\x8a\x00\x03\x0f\xc0\x00~\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\x80\x00>\x8a\x00\x03\x0f\xc0\x00>\x8a\x00\x03\x07\xc0\x00|\x8a\x00\x03\x07\xe0\x00\xfc\x8a\x00\x03\x07\xf0\x01\xf8\x8a\x00\x00\x03\x81\xff\x00\xfc\x89\x00\x00\x07\x82\xff\x00\xf0\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x00\x0f\x82\xff\x00\xf8\x88\x00\x05\x07\x80\x00\x01\xff\xf0\xff\x00\xff\x00\xff\x00\xa0\x00'
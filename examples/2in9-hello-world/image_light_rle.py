@@ -0,0 +1,3 @@
+# "hello world", rotated 90 deg, white bg, black text, run-length encoded for rle.py
+# 128 x 296
+hello_world_light_rle = b'RLE1\x80\x00(\x01\xff\xff\xff\xff\xff\xff\x80\xff\x00\xfd\x8d\xff\x00\xf8\x82\x00\x00\x0f\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf8\x82\x00\x00\x0f\x8a\xff\x01\xe0?\x8c\xff\x01\xf8\x1f\x8c\xff\x01\xfc\x0f\x8c\xff\x01\xfe\x07\x8d\xff\x00\x03\x8d\xff\x00\x83\x8d\xff\x00\xc1\x8d\xff\x00\xc1\x8d\xff\x00\xc1\x8d\xff\x00\xc1\x8d\xff\x00\x81\x8b\xff\x02\x80\x00\x01\x8a\xff\x03\xf8\x00\x00\x03\x8a\xff\x03\xf0\x00\x00\x03\x8a\xff\x03\xf0\x00\x00\x07\x8a\xff\x03\xf0\x00\x00?\x8a\xff\x01\xf8\x1f\xcd\xff\x01\xf0\x0f\x8c\xff\x01\x80\x01\x8c\xff\x80\x00\x00\x7f\x8a\xff\x03\xfe\x00\x00\x1f\x8a\xff\x03\xfc\x00\x00\x0f\x8a\xff\x03\xfc\x08 \x07\x8a\xff\x03\xf8\x1c<\x07\x8a\xff\x03\xf8\x1c>\x03\x8a\xff\x03\xf8>\x1f\x83\x8a\xff\x03\xf0>\x1f\x81\x8a\xff\x03\xf0~\x0f\xc1\x8a\xff\x03\xf0\x7f\x0f\xc1\x8a\xff\x03\xf0\x7f\x07\xc1\x8a\xff\x03\xf0\x7f\x87\xc1\x8a\xff\x03\xf0\x7f\x83\xc1\x8a\xff\x03\xf0\x7f\xc3\xc1\x8a\xff\x03\xf0\x7f\xc1\x81\x8a\xff\x03\xf8?\xc0\x83\x8a\xff\x03\xf8?\xe0\x03\x8a\xff\x03\xf8?\xe0\x03\x8a\xff\x03\xfc\x1f\xf0\x07\x8a\xff\x03\xfc\x0f\xf8\x0f\x8a\xff\x03\xfe\x07\xfc\x1f\x8b\xff\x00\x07\x8d\xff\x00\x8f\xfc\xff\x00\xf8\x82\x00\x00\x0f\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf8\x82\x00\x00\x0f\xff\xff\x87\xff\x00\xf8\x82\x00\x00\x0f\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf8\x82\x00\x00\x0f\xd9\xff\x01\xf8\x07\x8c\xff\x01\xc0\x00\x8c\xff\x80\x00\x00?\x8a\xff\x03\xfe\x00\x00\x1f\x8a\xff\x03\xfc\x00\x00\x0f\x8a\xff\x03\xf8\x07\xf0\x07\x8a\xff\x03\xf8\x1f\xfc\x07\x8a\xff\x03\xf8?\xff\x03\x8a\xff\x03\xf0\x7f\xff\x83\x8a\xff\x03\xf0\x7f\xff\x81\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0?\xff\xc1\x8a\xff\x03\xf8\x1f\xff\x81\x8a\xff\x03\xf8\x0f\xff\x01\x8a\xff\x03\xfc\x03\xfc\x03\x8a\xff\x03\xfe\x00\x00\x07\x8b\xff\x80\x00\x00\x07\x8b\xff\x02\x80\x00\x1f\x8b\xff\x02\xe0\x00?\x8b\xff\x01\xfc\x01\xff\xff\xff\xff\xcc\xff\x00\x03\x8c\xff\x01\x80\x01\x8b\xff\x02\xe0\x00\x01\x8b\xff\x80\x00\x00\x01\x8a\xff\x03\xfc\x00\x00\x03\x8a\xff\x02\xf8\x00\x00\x8b\xff\x02\xf0\x00\x7f\x8b\xff\x01\xf0\x1f\x8c\xff\x01\xf0\x03\x8c\xff\x02\xf8\x00?\x8b\xff\x02\xfc\x00\x07\x8c\xff\x80\x00\x00\x7f\x8b\xff\x02\xe0\x00\x0f\x8b\xff\x02\xfe\x00\x03\x8c\xff\x01\xc0\x01\x8c\xff\x01\xfc\x01\x8b\xff\x02\xfe\x00\x01\x8b\xff\x02\xc0\x00\x03\x8a\xff\x03\xfe\x00\x00\x1f\x8a\xff\x02\xf8\x00\x03\x8b\xff\x01\xf0\x01\x8c\xff\x01\xf0?\x8c\xff\x01\xf0\x03\x8c\xff\x02\xf0\x00?\x8b\xff\x02\xfc\x00\x03\x8b\xff\x03\xfe\x00\x00?\x8b\xff\x02\xc0\x00\x03\x8b\xff\x02\xfc\x00\x01\x8c\xff\x01\xc0\x01\x8c\xff\x01\xfc\x01\x8d\xff\x00\xc3\xab\xff\x01\xf8\x07\x8c\xff\x01\xc0\x00\x8c\xff\x80\x00\x00?\x8a\xff\x03\xfe\x00\x00\x1f\x8a\xff\x03\xfc\x00\x00\x0f\x8a\xff\x03\xf8\x07\xf0\x07\x8a\xff\x03\xf8\x1f\xfc\x07\x8a\xff\x03\xf8?\xff\x03\x8a\xff\x03\xf0\x7f\xff\x83\x8a\xff\x03\xf0\x7f\xff\x81\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0?\xff\xc1\x8a\xff\x03\xf8\x1f\xff\x81\x8a\xff\x03\xf8\x0f\xff\x01\x8a\xff\x03\xfc\x03\xfc\x03\x8a\xff\x03\xfe\x00\x00\x07\x8b\xff\x80\x00\x00\x07\x8b\xff\x02\x80\x00\x1f\x8b\xff\x02\xe0\x00?\x8b\xff\x01\xfc\x01\xfb\xff\x03\xf8\x00\x00\x03\x8a\xff\x03\xf0\x00\x00\x01\x8a\xff\x03\xf0\x00\x00\x01\x8a\xff\x03\xf0\x00\x00\x01\x8a\xff\x03\xf8\x00\x00\x07\x8c\xff\x01\xf0\x1f\x8c\xff\x01\xfc\x0f\x8c\xff\x01\xfe\x0f\x8d\xff\x00\x07\x8d\xff\x00\x83\x8d\xff\x00\x83\x8d\xff\x00\x83\x8d\xff\x00\xc1\x8d\xff\x00\xc1\x8c\xff\x01\xf8\x01\x8c\xff\x01\xf0\x01\x8c\xff\x01\xf0\x01\x8c\xff\x01\xf0\x03\x8c\xff\x01\xf8\x07\xfa\xff\x00\xf8\x82\x00\x00\x0f\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf8\x82\x00\x00\x0f\xc9\xff\x01\xf8\x07\x8c\xff\x01\xc0\x00\x8c\xff\x02\x80\x00?\x8a\xff\x03\xfe\x00\x00\x1f\x8a\xff\x03\xfe\x00\x00\x0f\x8a\xff\x03\xfc\x03\xf8\x07\x8a\xff\x03\xf8\x0f\xfe\x03\x8a\xff\x03\xf8\x1f\xff\x03\x8a\xff\x03\xf0?\xff\x83\x8a\xff\x03\xf0?\xff\x81\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0\x7f\xff\xc1\x8a\xff\x03\xf0?\xff\xc1\x8a\xff\x03\xf8?\xff\x83\x8a\xff\x03\xf8\x1f\xff\x03\x8a\xff\x03\xf8\x0f\xfe\x07\x8a\xff\x00\xfc\x81\x00\x00\x03\x89\xff\x00\xf8\x82\x00\x00\x0f\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x00\xf0\x82\x00\x00\x07\x88\xff\x05\xf8\x7f\xff\xfe\x00\x0f\xff\xff\xff\xff\xff\xff\xa0\xff'
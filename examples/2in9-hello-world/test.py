@@ -34,6 +34,18 @@ e.display_frame()
 
 # --------------------
 
+# the same images, run-length encoded, decoded while they are sent
+# 1182 bytes each instead of 4736
+from rle import RLEImage
+from image_dark_rle import hello_world_dark_rle
+from image_light_rle import hello_world_light_rle
+for data in (hello_world_dark_rle, hello_world_light_rle):
+	img = RLEImage(data)
+	e.set_frame_memory(img, x, y, img.width, img.height)
+	e.display_frame()
+
+# --------------------
+
 # clear display
 e.clear_frame_memory(b'\xFF')
 e.display_frame()
@@ -74,6 +86,14 @@ e.display_frame()
 # display as much as this as fits in the box
 str = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. Etiam vel neque in elit tristique vulputate at et dui. Maecenas nec felis lectus. Pellentesque sit amet facilisis dui. Maecenas ac arcu euismod, tempor massa quis, ultricies est.'
 
+# lines drawn before are blitted from the cache instead of being laid out again
+from epdfont import FramebufFont
+from textcache import TextCache
+font8 = FramebufFont()
+cache = TextCache()
+fb_w = w # text_wrap's w and h are the box, these are the frame
+fb_h = h
+
 # this could be useful as a new method in FrameBuffer
 def text_wrap(str,x,y,color,w,h,border=None):
 	# optional box border
@@ -84,7 +104,7 @@ def text_wrap(str,x,y,color,w,h,border=None):
 	j = 0
 	for i in range(0, len(str), cols):
 		# draw as many chars fit on the line
-		fb.text(str[i:i+cols], x, y + j, color)
+		cache.draw(buf, fb_w, fb_h, x, y + j, str[i:i+cols], font8, color)
 		j += 8
 		# dont overflow text outside the box
 		if j >= h:
@@ -120,5 +140,6 @@ bh = 8 * 8 # 64 = 8 rows (64 chars in total)
 text_wrap(str,bx,by,black,bw,bh,None)
 e.set_frame_memory(buf, x, y, w, h)
 e.display_frame()
+print('text cache hits', cache.hits, 'misses', cache.misses)
 
 # --------------------
@@ -0,0 +1,184 @@
+"""
+MicroPython Waveshare e-paper frame differ, sends only the parts of a frame that changed
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from micropython import const
+
+MAX_RECTS = const(4) # windows per push, nearby windows are merged down to this many
+ROW_GAP   = const(8) # unchanged rows that still join two changed runs into one window
+
+# record the first and last changed byte column of each row of two 1bpp frames in lo and hi
+# rows without changes keep lo 0xFF, returns the number of changed bytes
+def _scan(new, old, size, stride, lo, hi):
+    y = 0
+    row = 0 # offset of row y
+    n = 0
+    for j in range(size):
+        if new[j] != old[j]:
+            while j >= row + stride:
+                row += stride
+                y += 1
+            x = j - row
+            if x < lo[y]:
+                lo[y] = x
+            if x > hi[y]:
+                hi[y] = x
+            n += 1
+    return n
+
+# the same scan, 4 bytes at a time, where the native emitter is available
+try:
+    from framediff_viper import scan as _scan_words, aligned as _aligned
+except (ImportError, SyntaxError):
+    _scan_words = None
+
+# Keeps a copy of what each memory area of the panel holds and writes only the changed
+# windows of a new frame with set_frame_memory. Frames are 1bpp, rows of (width + 7) // 8 bytes.
+# The SSD drivers (1.54", 2.13", 2.9") switch memory areas on every display_frame, so by
+# default two copies are kept and each push is compared with the area it is written to.
+class FrameDiff:
+    def __init__(self, epd, banks=2, max_rects=MAX_RECTS, gap=ROW_GAP):
+        self.epd = epd
+        self.width = epd.width
+        self.height = epd.height
+        self.stride = (self.width + 7) // 8
+        self.size = self.stride * self.height
+        self.max_rects = max(1, max_rects)
+        self.gap = gap
+        self._banks = [bytearray(self.size) for _ in range(banks)]
+        self._valid = [False] * banks
+        self._bank = 0
+        self._lo = bytearray(self.height)
+        self._hi = bytearray(self.height)
+        self._scratch = bytearray(0)
+        self.bytes_sent = 0 # image bytes written by the last push
+
+    # forget what the panel holds, the next push to each memory area sends the whole frame
+    # call after init() or anything else that writes the frame memory directly
+    def invalidate(self):
+        for i in range(len(self._valid)):
+            self._valid[i] = False
+
+    # the windows of frame that differ from the memory area written next, as (x, y, w, h)
+    # x and w are multiples of 8
+    def diff(self, frame):
+        if len(frame) < self.size:
+            raise ValueError('frame smaller than the panel')
+        if not self._valid[self._bank]:
+            return [(0, 0, self.stride * 8, self.height)]
+        lo = self._lo
+        hi = self._hi
+        for y in range(self.height):
+            lo[y] = 0xFF
+            hi[y] = 0
+        old = self._banks[self._bank]
+        scan = _scan
+        if _scan_words is not None and _aligned(frame, old, self.size):
+            scan = _scan_words
+        if scan(frame, old, self.size, self.stride, lo, hi) == 0:
+            return []
+
+        # runs of changed rows, joined across short gaps, in byte columns
+        rects = []
+        last = -self.gap - 2
+        for y in range(self.height):
+            if lo[y] == 0xFF:
+                continue
+            if y - last <= self.gap + 1:
+                r = rects[-1]
+                r[0] = min(r[0], lo[y])
+                r[2] = max(r[2], hi[y])
+                r[3] = y
+            else:
+                rects.append([lo[y], y, hi[y], y])
+            last = y
+
+        # too many windows: merge the neighbouring pair that adds the least area
+        while len(rects) > self.max_rects:
+            best = 0
+            cost = None
+            for i in range(len(rects) - 1):
+                a = rects[i]
+                b = rects[i + 1]
+                merged = (max(a[2], b[2]) - min(a[0], b[0]) + 1) * (b[3] - a[1] + 1)
+                added = merged - (a[2] - a[0] + 1) * (a[3] - a[1] + 1) - (b[2] - b[0] + 1) * (b[3] - b[1] + 1)
+                if cost is None or added < cost:
+                    best = i
+                    cost = added
+            a = rects[best]
+            b = rects.pop(best + 1)
+            a[0] = min(a[0], b[0])
+            a[2] = max(a[2], b[2])
+            a[3] = b[3]
+
+        return [(x0 * 8, y0, (x1 - x0 + 1) * 8, y1 - y0 + 1) for x0, y0, x1, y1 in rects]
+
+    # write the changed windows of frame to the panel, returns them as (x, y, w, h)
+    # rects, if given, is what diff(frame) just returned, so the frame is not scanned again
+    # follow with display_frame(), the next push goes to the other memory area
+    def push(self, frame, rects=None):
+        if rects is None:
+            rects = self.diff(frame)
+        for window in self._windows(frame, rects):
+            self.epd.set_frame_memory(*window)
+        self._pushed(frame)
+        return rects
+
+    async def push_async(self, frame, rects=None):
+        if rects is None:
+            rects = self.diff(frame)
+        for window in self._windows(frame, rects):
+            await self.epd.set_frame_memory_async(*window)
+        self._pushed(frame)
+        return rects
+
+    # set_frame_memory arguments for each window, the image is only valid until the next one
+    def _windows(self, frame, rects):
+        frame = memoryview(frame)
+        stride = self.stride
+        self.bytes_sent = 0
+        for x, y, w, h in rects:
+            wb = w // 8
+            n = wb * h
+            o = y * stride + x // 8
+            if wb == stride:
+                # full width rows are already contiguous in the frame
+                image = frame[o:o + n]
+            else:
+                if len(self._scratch) < n:
+                    self._scratch = bytearray(n)
+                image = memoryview(self._scratch)
+                for r in range(h):
+                    image[r * wb:r * wb + wb] = frame[o:o + wb]
+                    o += stride
+                image = image[:n]
+            self.bytes_sent += n
+            yield image, x, y, w, h
+
+    # frame is now in the memory area just written, move on to the next
+    def _pushed(self, frame):
+        self._banks[self._bank][:] = memoryview(frame)[:self.size]
+        self._valid[self._bank] = True
+        self._bank = (self._bank + 1) % len(self._banks)
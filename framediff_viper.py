@@ -0,0 +1,65 @@
+"""
+MicroPython Waveshare e-paper frame differ, native scan for ports with the viper emitter
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import micropython
+from uctypes import addressof
+
+# the word scan reads both buffers 4 bytes at a time, so they must start on a 4 byte
+# boundary and the scan must cover whole words
+def aligned(new, old, size):
+    return size & 3 == 0 and (addressof(new) | addressof(old)) & 3 == 0
+
+# as framediff._scan, skipping 4 unchanged bytes at a time, only when aligned() says so
+@micropython.viper
+def scan(new, old, size: int, stride: int, lo, hi) -> int:
+    a = ptr32(new)
+    b = ptr32(old)
+    p = ptr8(new)
+    q = ptr8(old)
+    l = ptr8(lo)
+    h = ptr8(hi)
+    y = 0
+    row = 0
+    n = 0
+    j = 0
+    while j < size:
+        if a[j >> 2] == b[j >> 2]:
+            j += 4
+            continue
+        end = j + 4
+        while j < end:
+            if p[j] != q[j]:
+                while j >= row + stride:
+                    row += stride
+                    y += 1
+                x = j - row
+                if x < l[y]:
+                    l[y] = x
+                if x > h[y]:
+                    h[y] = x
+                n += 1
+            j += 1
+    return n
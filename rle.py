@@ -0,0 +1,130 @@
+"""
+MicroPython Waveshare e-paper run-length encoded images, decoded while they stream to the panel
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from micropython import const
+
+# File layout: MAGIC, width and height as little endian 16 bit, then packets until the
+# (width + 7) // 8 * height bytes of the 1bpp MONO_HLSB image are produced.
+# Packets are a control byte c:
+#   c < 0x80  c + 1 literal bytes follow (1 to 128)
+#   c >= 0x80 the next byte repeats (c & 0x7F) + MIN_RUN times (2 to 129)
+MAGIC   = b'RLE1'
+HEADER  = const(8)
+MIN_RUN = const(2)
+CHUNK   = const(128) # default size of the decode buffers
+
+# An encoded image that streams as chunks of decoded bytes. Pass it anywhere a plane is
+# accepted, it is decoded into one small buffer while it is sent:
+#   e.set_frame_memory(img, x, y, img.width, img.height)
+#   e.display_frame(img)
+# src is a bytes-like object, or a stream opened 'rb' which is read CHUNK bytes at a time.
+# Each chunk is a view of the same buffer, valid until the next one is taken.
+class RLEImage:
+    def __init__(self, src, chunk=CHUNK):
+        self._src = src
+        try:
+            head = memoryview(src)[:HEADER]
+            self._in = None
+        except TypeError:
+            self._start = src.tell() if hasattr(src, 'tell') else 0
+            head = src.read(HEADER)
+            self._in = bytearray(chunk)
+        if len(head) < HEADER or bytes(head[:4]) != MAGIC:
+            raise ValueError('not an RLE image')
+        self.width = head[4] | head[5] << 8
+        self.height = head[6] | head[7] << 8
+        self.size = (self.width + 7) // 8 * self.height
+        self._out = bytearray(chunk)
+
+    def __len__(self):
+        return self.size
+
+    # decode again from the start, streams are rewound with seek
+    def __iter__(self):
+        return self._decode()
+
+    # the next part of the source, returns (buffer, pos, end)
+    def _read(self):
+        n = self._src.readinto(self._in) if self._in is not None else 0
+        if not n:
+            raise ValueError('RLE image truncated')
+        return self._in, 0, n
+
+    def _decode(self):
+        out = memoryview(self._out)
+        room = len(out)
+        n = 0 # decoded bytes waiting in out
+        left = self.size
+        if self._in is None:
+            inp = memoryview(self._src)
+            pos = HEADER
+            end = len(inp)
+        else:
+            if hasattr(self._src, 'seek'):
+                self._src.seek(self._start + HEADER)
+            inp = self._in
+            pos = end = 0
+        while left:
+            if pos == end:
+                inp, pos, end = self._read()
+            c = inp[pos]
+            pos += 1
+            if c & 0x80:
+                if pos == end:
+                    inp, pos, end = self._read()
+                value = inp[pos]
+                pos += 1
+                count = (c & 0x7F) + MIN_RUN
+            else:
+                value = None
+                count = c + 1
+            if count > left:
+                raise ValueError('RLE image overruns its size')
+            left -= count
+            while count:
+                k = min(count, room - n)
+                if value is None:
+                    if pos == end:
+                        inp, pos, end = self._read()
+                    k = min(k, end - pos)
+                    out[n:n + k] = inp[pos:pos + k]
+                    pos += k
+                else:
+                    # one byte, then double the copied span until the run is written
+                    out[n] = value
+                    m = 1
+                    while m < k:
+                        step = min(m, k - m)
+                        out[n + m:n + m + step] = out[n:n + step]
+                        m += step
+                n += k
+                count -= k
+                if n == room:
+                    yield out
+                    n = 0
+        if n:
+            yield out[:n]
@@ -0,0 +1,150 @@
+"""
+MicroPython Waveshare e-paper refresh scheduler, partial updates with a bound on ghosting
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from micropython import const
+from time import ticks_ms, ticks_diff
+from framediff import FrameDiff
+
+# Decisions
+SKIP    = const(0) # nothing changed, nothing sent
+PARTIAL = const(1) # changed windows sent, refreshed with the partial update lut
+FULL    = const(2) # whole frame sent, refreshed with the full update lut
+
+# Default policy
+MAX_PARTIALS = const(20)      # partial updates between full refreshes
+MAX_AREA     = const(300)     # changed area between full refreshes, percent of the panel
+MAX_AGE_MS   = const(1800000) # time between full refreshes, 30 minutes
+LARGE_AREA   = const(50)      # a single update changing more than this percent of the panel goes full
+
+# Decides, for each new frame, between a partial update of the changed windows and a full
+# refresh, for the SSD drivers with LUT_FULL_UPDATE and LUT_PARTIAL_UPDATE (1.54", 2.13", 2.9").
+# Partial updates are promoted to full ones once enough of them, or enough changed area, or
+# enough time has built up since the last full refresh, so ghosting stays bounded.
+# Set any limit to None to disable it.
+# Any driver with lut, set_lut, set_frame_memory, refresh and finish, and the async variants
+# of the last three, will do.
+class RefreshScheduler:
+    def __init__(self, epd, max_partials=MAX_PARTIALS, max_area=MAX_AREA, max_age_ms=MAX_AGE_MS,
+                 large_area=LARGE_AREA, diff=None, log=None):
+        self.epd = epd
+        self.diff = diff if diff is not None else FrameDiff(epd)
+        self.max_partials = max_partials
+        self.max_area = max_area
+        self.max_age_ms = max_age_ms
+        self.large_area = large_area
+        self.log = log # called with (decision, reason, area) after every update
+        self.panel_area = epd.width * epd.height
+        self.fulls = 0 # full refreshes so far
+        self.last = (SKIP, None) # last decision and its reason
+        self.invalidate()
+
+    # forget the panel state, the next update is a full refresh
+    # call after init() or anything else that writes the frame memory directly
+    def invalidate(self):
+        self.partials = 0 # partial updates since the last full refresh
+        self.area = 0 # pixels changed by them
+        self._full_at = None
+        self._force = False
+        self.diff.invalidate()
+
+    # make the next update a full refresh, even if nothing changed
+    def force_full(self):
+        self._force = True
+
+    # returns (decision, reason), reason is one of 'forced', 'first', 'large', 'count',
+    # 'area', 'age' for FULL, 'changed' for PARTIAL and 'unchanged' for SKIP
+    def decide(self, area):
+        if self._force:
+            return FULL, 'forced'
+        if self._full_at is None:
+            return FULL, 'first'
+        if area == 0:
+            return SKIP, 'unchanged'
+        if self.large_area is not None and area * 100 > self.large_area * self.panel_area:
+            return FULL, 'large'
+        if self.max_partials is not None and self.partials >= self.max_partials:
+            return FULL, 'count'
+        if self.max_area is not None and (self.area + area) * 100 > self.max_area * self.panel_area:
+            return FULL, 'area'
+        if self.max_age_ms is not None and ticks_diff(ticks_ms(), self._full_at) >= self.max_age_ms:
+            return FULL, 'age'
+        return PARTIAL, 'changed'
+
+    # show frame, returns (decision, reason)
+    def update(self, frame):
+        decision, rects = self._update(frame)
+        if decision[0] != SKIP:
+            epd = self.epd
+            self.diff.push(frame, rects)
+            epd.refresh()
+            # the refresh switched memory areas, bring the other one up to date
+            self.diff.push(frame)
+        return decision
+
+    # as update, every transfer and wait returns to the event loop
+    async def update_async(self, frame):
+        await self.epd.finish_async()
+        decision, rects = self._update(frame)
+        if decision[0] != SKIP:
+            epd = self.epd
+            await self.diff.push_async(frame, rects)
+            await epd.refresh_async()
+            await self.diff.push_async(frame)
+        return decision
+
+    # decide, and select the lut for it, returns the decision and the windows to push
+    def _update(self, frame):
+        epd = self.epd
+        epd.finish()
+        rects = self.diff.diff(frame)
+        area = 0
+        for x, y, w, h in rects:
+            area += w * h
+        decision = self.decide(area)
+        kind = decision[0]
+        if kind == FULL:
+            self._set_lut(epd.LUT_FULL_UPDATE)
+            # and the whole frame into both memory areas
+            self.diff.invalidate()
+            rects = None
+            self.fulls += 1
+            self.partials = 0
+            self.area = 0
+            self._full_at = ticks_ms()
+            self._force = False
+        elif kind == PARTIAL:
+            self._set_lut(epd.LUT_PARTIAL_UPDATE)
+            self.partials += 1
+            self.area += area
+        self.last = decision
+        if self.log is not None:
+            self.log(kind, decision[1], area)
+        return decision, rects
+
+    # the drivers remember the last lut written, upload only on a change
+    def _set_lut(self, lut):
+        if self.epd.lut is not lut:
+            self.epd.set_lut(lut)
@@ -0,0 +1,80 @@
+"""
+MicroPython Waveshare e-paper text cache, reuses rendered strings instead of drawing them again
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from micropython import const
+from epdfont import FONT, text_extent, draw_text, blit_mask
+
+BUDGET = const(4096) # bytes of rendered strips to keep
+
+# Keeps the strings drawn most recently as MONO_HLSB strips, one bit per pixel of the
+# glyphs, rows of (width + 7) // 8 bytes, and blits them back instead of laying out the
+# glyphs again. Entries are keyed by (text, font) and the least recently used ones are
+# dropped to stay within budget bytes of strips. A strip is a mask, so it serves any
+# colour, and with the drivers rotating at transmit time it serves any rotation too.
+# A string whose strip alone is over budget is drawn directly.
+class TextCache:
+    def __init__(self, budget=BUDGET):
+        self.budget = budget
+        self.used = 0   # bytes of strips held
+        self.hits = 0
+        self.misses = 0
+        self._strips = {} # (text, font): [strip, width, last use]
+        self._tick = 0
+
+    def clear(self):
+        self._strips = {}
+        self.used = 0
+
+    # as epdfont.draw_text, with the strip of text taken from the cache when it is there
+    def draw(self, buf, width, height, x, y, text, font=FONT, bit=0):
+        self._tick += 1
+        key = (text, font)
+        entry = self._strips.get(key)
+        if entry is None:
+            self.misses += 1
+            w = text_extent(text, font)[1]
+            size = ((w + 7) >> 3) * font.height
+            if size > self.budget:
+                draw_text(buf, width, height, x, y, text, font, bit)
+                return
+            strip = bytearray(size)
+            draw_text(strip, w, font.height, 0, 0, text, font, 1)
+            while self.used + size > self.budget:
+                self._evict()
+            entry = self._strips[key] = [strip, w, 0]
+            self.used += size
+        else:
+            self.hits += 1
+        entry[2] = self._tick
+        blit_mask(buf, width, height, x, y, entry[0], entry[1], font.height, bit)
+
+    def _evict(self):
+        oldest = None
+        for key, entry in self._strips.items():
+            if oldest is None or entry[2] < self._strips[oldest][2]:
+                oldest = key
+        self.used -= len(self._strips.pop(oldest)[0])
@@ -0,0 +1,213 @@
+"""
+Host side font compiler, builds glyph packs for epdfont.GlyphPack, run with CPython
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+# Rasterise a BDF or TTF/OTF font into a glyph pack.
+#
+#   python3 tools/font_compile.py font.bdf font.epf
+#   python3 tools/font_compile.py DejaVuSans.ttf sans16.epf --size 16 --chars "0123456789.-C%"
+#
+# BDF fonts are read directly, TTF/OTF fonts need PIL. Kerning is taken from TTF/OTF fonts,
+# for the pairs of characters in the pack.
+#
+# Pack layout, little endian:
+#   header  'EPF1', height u8, baseline u8, max width u8, 0 u8, glyphs u16, kerning pairs u16
+#   index   per glyph, sorted by codepoint: codepoint u16, bitmap offset u32,
+#           width u8, advance u8, first row u8, rows u8
+#   kerning per pair, sorted by (left, right): left u16, right u16, adjust i8
+#   bitmaps rows of (width + 7) // 8 bytes, MSB leftmost, only the rows from first row
+#           that hold pixels, identical bitmaps are stored once
+
+import argparse
+import struct
+import sys
+
+MAGIC = b'EPF1'
+HEADER = struct.Struct('<4sBBBBHH')
+ENTRY = struct.Struct('<HIBBBB')
+PAIR = struct.Struct('<HHb')
+
+
+# a glyph is (width, advance, rows), rows being height ints of (width + 7) // 8 bytes
+def load_bdf(path, codepoints):
+    glyphs = {}
+    ascent = descent = None
+    with open(path, encoding='latin-1') as f:
+        lines = iter(f.read().splitlines())
+    for line in lines:
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == 'FONT_ASCENT':
+            ascent = int(words[1])
+        elif words[0] == 'FONT_DESCENT':
+            descent = int(words[1])
+        elif words[0] == 'FONTBOUNDINGBOX' and ascent is None:
+            ascent = int(words[2]) + int(words[4])
+            descent = -int(words[4])
+        elif words[0] == 'STARTCHAR':
+            cp = advance = bbx = None
+            bitmap = []
+            for line in lines:
+                words = line.split()
+                if not words:
+                    continue
+                if words[0] == 'ENCODING':
+                    cp = int(words[1])
+                elif words[0] == 'DWIDTH':
+                    advance = int(words[1])
+                elif words[0] == 'BBX':
+                    bbx = [int(v) for v in words[1:5]]
+                elif words[0] == 'BITMAP':
+                    for line in lines:
+                        if line.strip() == 'ENDCHAR':
+                            break
+                        bitmap.append(line.strip())
+                    break
+            if cp is None or cp not in codepoints or bbx is None:
+                continue
+            w, h, xo, yo = bbx
+            xo = max(xo, 0)
+            width = w + xo
+            gs = (width + 7) // 8
+            height = ascent + descent
+            rows = [0] * height
+            top = ascent - (yo + h)
+            for r, hexrow in enumerate(bitmap[:h]):
+                bits = int(hexrow, 16) if hexrow else 0
+                bits >>= len(hexrow) * 4 - w # just the w pixels
+                y = top + r
+                if 0 <= y < height:
+                    rows[y] = bits << (gs * 8 - width)
+            glyphs[cp] = (width, advance if advance is not None else width, rows)
+    if ascent is None:
+        raise ValueError('no FONT_ASCENT or FONTBOUNDINGBOX in %s' % path)
+    return ascent + descent, ascent, glyphs, {}
+
+
+def load_ttf(path, size, codepoints):
+    from PIL import Image, ImageDraw, ImageFont
+    font = ImageFont.truetype(path, size)
+    ascent, descent = font.getmetrics()
+    height = ascent + descent
+    glyphs = {}
+    for cp in codepoints:
+        ch = chr(cp)
+        if cp != 32 and font.getmask(ch).getbbox() is None:
+            continue # not in the font
+        advance = int(round(font.getlength(ch)))
+        width = max(font.getbbox(ch)[2], 0)
+        gs = (width + 7) // 8
+        img = Image.new('1', (max(width, 1), height))
+        ImageDraw.Draw(img).text((0, 0), ch, font=font, fill=1)
+        px = img.load()
+        rows = []
+        for y in range(height):
+            bits = 0
+            for x in range(width):
+                if px[x, y]:
+                    bits |= 1 << (gs * 8 - 1 - x)
+            rows.append(bits)
+        glyphs[cp] = (width, advance, rows)
+    kerns = {}
+    chars = sorted(glyphs)
+    for a in chars:
+        for b in chars:
+            pair = font.getlength(chr(a) + chr(b))
+            k = int(round(pair - font.getlength(chr(a)) - font.getlength(chr(b))))
+            if k:
+                kerns[(a, b)] = max(-128, min(127, k))
+    return height, ascent, glyphs, kerns
+
+
+def pack(height, baseline, glyphs, kerns):
+    cps = sorted(cp for cp in glyphs if cp <= 0xFFFF)
+    index = bytearray()
+    bitmaps = bytearray()
+    seen = {}
+    max_width = 0
+    for cp in cps:
+        width, advance, rows = glyphs[cp]
+        if width > 255 or advance > 255 or advance < 0:
+            raise ValueError('glyph U+%04X too wide' % cp)
+        gs = (width + 7) // 8
+        used = [i for i, r in enumerate(rows) if r]
+        first = used[0] if used else 0
+        count = used[-1] - first + 1 if used else 0
+        data = b''.join(r.to_bytes(gs, 'big') for r in rows[first:first + count])
+        offset = seen.get(data)
+        if offset is None:
+            offset = seen[data] = len(bitmaps)
+            bitmaps += data
+        index += ENTRY.pack(cp, offset, width, advance, first, count)
+        max_width = max(max_width, width)
+    pairs = sorted((a, b, k) for (a, b), k in kerns.items() if a in glyphs and b in glyphs and a <= 0xFFFF and b <= 0xFFFF)
+    kerning = b''.join(PAIR.pack(*p) for p in pairs)
+    return HEADER.pack(MAGIC, height, baseline, max_width, 0, len(cps), len(pairs)) + index + kerning + bitmaps
+
+
+def parse_chars(args):
+    cps = set()
+    for part in args.range.split(','):
+        if part:
+            lo, _, hi = part.partition('-')
+            cps.update(range(int(lo, 0), int(hi or lo, 0) + 1))
+    if args.chars:
+        cps.update(ord(c) for c in args.chars)
+    if args.chars_file:
+        with open(args.chars_file, encoding='utf-8') as f:
+            cps.update(ord(c) for c in f.read() if c not in '\r\n')
+    return cps
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Compile a BDF or TTF font into an epdfont glyph pack')
+    p.add_argument('input', help='.bdf, .ttf or .otf font')
+    p.add_argument('output', help='glyph pack to write')
+    p.add_argument('--size', type=int, default=16, help='pixel size for TTF/OTF fonts')
+    p.add_argument('--range', default='32-126', help='codepoint ranges, e.g. 32-126,0xB0 (empty for none)')
+    p.add_argument('--chars', help='extra characters to include')
+    p.add_argument('--chars-file', help='file whose characters are included, e.g. all the labels of an app')
+    args = p.parse_args(argv)
+
+    cps = parse_chars(args)
+    if args.input.lower().endswith('.bdf'):
+        height, baseline, glyphs, kerns = load_bdf(args.input, cps)
+    else:
+        height, baseline, glyphs, kerns = load_ttf(args.input, args.size, cps)
+    if height > 255:
+        raise SystemExit('font too tall')
+    missing = sorted(cps - set(glyphs))
+    if missing:
+        sys.stderr.write('not in the font: %s\n' % ' '.join('U+%04X' % cp for cp in missing[:20]))
+    blob = pack(height, baseline, glyphs, kerns)
+    with open(args.output, 'wb') as f:
+        f.write(blob)
+    sys.stderr.write('%d glyphs, %d kerning pairs, height %d: %d bytes\n' % (
+        len(glyphs), len(kerns), height, len(blob)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Host side encoder for rle.py images, run with CPython
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+# Encode a 1bpp MONO_HLSB image as an rle.py image.
+#
+#   python3 tools/rle_encode.py hello.png hello.rle
+#   python3 tools/rle_encode.py hello.png image_hello.py --name hello
+#   python3 tools/rle_encode.py raw.bin raw.rle --size 128x296
+#
+# Images are read with PIL and thresholded, dark pixels become 0 (black on the panels).
+# Raw .bin input is taken as is. A .py output holds a bytes literal named --name.
+
+import argparse
+import struct
+import sys
+
+MAGIC = b'RLE1'
+MIN_RUN = 2
+MAX_RUN = 0x7F + MIN_RUN
+MAX_LITERAL = 0x80
+
+
+def encode(data, width, height):
+    size = (width + 7) // 8 * height
+    if len(data) < size:
+        raise ValueError('image smaller than %dx%d' % (width, height))
+    data = bytes(data[:size])
+    out = bytearray(MAGIC + struct.pack('<HH', width, height))
+    literal = bytearray()
+
+    def flush():
+        for i in range(0, len(literal), MAX_LITERAL):
+            part = literal[i:i + MAX_LITERAL]
+            out.append(len(part) - 1)
+            out.extend(part)
+        del literal[:]
+
+    i = 0
+    while i < size:
+        j = i + 1
+        while j < size and j - i < MAX_RUN and data[j] == data[i]:
+            j += 1
+        # a pair between literals costs the same either way, keep it literal
+        if j - i > MIN_RUN or (j - i == MIN_RUN and not literal):
+            flush()
+            out.append(0x80 | (j - i - MIN_RUN))
+            out.append(data[i])
+        else:
+            literal.extend(data[i:j])
+        i = j
+    flush()
+    return bytes(out)
+
+
+def decode(blob):
+    if blob[:4] != MAGIC:
+        raise ValueError('not an RLE image')
+    width, height = struct.unpack_from('<HH', blob, 4)
+    size = (width + 7) // 8 * height
+    out = bytearray()
+    i = 8
+    while len(out) < size:
+        c = blob[i]
+        if c & 0x80:
+            out.extend(blob[i + 1:i + 2] * ((c & 0x7F) + MIN_RUN))
+            i += 2
+        else:
+            out.extend(blob[i + 1:i + 2 + c])
+            i += 2 + c
+    if len(out) != size:
+        raise ValueError('RLE image overruns its size')
+    return width, height, bytes(out)
+
+
+def load_image(path, threshold=128, invert=False):
+    from PIL import Image
+    img = Image.open(path).convert('L')
+    width, height = img.size
+    stride = (width + 7) // 8
+    px = img.load()
+    data = bytearray(b'\xff' * (stride * height))
+    for y in range(height):
+        for x in range(width):
+            dark = px[x, y] < threshold
+            if dark != invert:
+                data[y * stride + (x >> 3)] &= ~(0x80 >> (x & 7))
+    return width, height, data
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Encode a 1bpp image for rle.py')
+    p.add_argument('input', help='image file (png, bmp, ...) or raw MONO_HLSB .bin')
+    p.add_argument('output', help='.rle binary, or .py module holding a bytes literal')
+    p.add_argument('--size', help='WxH of a raw .bin input')
+    p.add_argument('--name', default='image', help='variable name in a .py output')
+    p.add_argument('--threshold', type=int, default=128, help='grey level below which a pixel is dark')
+    p.add_argument('--invert', action='store_true', help='make light pixels 0 instead')
+    args = p.parse_args(argv)
+
+    if args.size:
+        width, height = (int(v) for v in args.size.lower().split('x'))
+        with open(args.input, 'rb') as f:
+            data = f.read()
+    else:
+        width, height, data = load_image(args.input, args.threshold, args.invert)
+
+    blob = encode(data, width, height)
+    if decode(blob)[2] != bytes(data[:(width + 7) // 8 * height]):
+        raise SystemExit('round trip failed')
+
+    if args.output.endswith('.py'):
+        with open(args.output, 'w') as f:
+            f.write('# %dx%d, %s\n' % (width, height, args.input))
+            f.write('%s = %r\n' % (args.name, blob))
+    else:
+        with open(args.output, 'wb') as f:
+            f.write(blob)
+    size = (width + 7) // 8 * height
+    sys.stderr.write('%dx%d: %d bytes -> %d bytes\n' % (width, height, size, len(blob)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+MicroPython Waveshare e-paper tri-colour canvas, both planes of the (B) panels in one buffer
+https://github.com/mcauser/micropython-waveshare-epaper
+
+MIT License
+Copyright (c) 2018 Mike Causer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import framebuf
+from micropython import const
+
+# Colours
+WHITE = const(0)
+BLACK = const(1)
+RED   = const(2) # yellow on the (C) panels
+
+# A black/white/red drawing surface for the (B) drivers (1.54", 2.13", 2.7", 2.9", 4.2",
+# 5.83", 7.5"). The black and red planes sit back to back in one bytearray and each
+# drawing call sets both, so a shape is drawn once with its colour instead of once per plane.
+# display() hands the driver a memoryview of each half, nothing is copied or converted.
+# The pixel polarity comes from the driver's COLORED, the bit value of a black or red pixel.
+# Red pixels are white on the black plane, so red always wins.
+class Canvas:
+    def __init__(self, epd, buf=None):
+        self.epd = epd
+        self.width = epd.width
+        self.height = epd.height
+        size = (self.width + 7) // 8 * self.height
+        if buf is None:
+            buf = bytearray(size * 2)
+        elif len(buf) < size * 2:
+            raise ValueError('buffer smaller than two planes')
+        self.buf = buf
+        mv = memoryview(buf)
+        self.black = mv[:size]
+        self.red = mv[size:size * 2]
+        self._fb_black = framebuf.FrameBuffer(self.black, self.width, self.height, framebuf.MONO_HLSB)
+        self._fb_red = framebuf.FrameBuffer(self.red, self.width, self.height, framebuf.MONO_HLSB)
+        # bit values per colour, (black plane, red plane)
+        on = epd.COLORED
+        off = on ^ 1
+        self._bits = ((off, off), (on, off), (off, on))
+
+    def fill(self, color):
+        b, r = self._bits[color]
+        self._fb_black.fill(b)
+        self._fb_red.fill(r)
+
+    def pixel(self, x, y, color):
+        b, r = self._bits[color]
+        self._fb_black.pixel(x, y, b)
+        self._fb_red.pixel(x, y, r)
+
+    def hline(self, x, y, w, color):
+        b, r = self._bits[color]
+        self._fb_black.hline(x, y, w, b)
+        self._fb_red.hline(x, y, w, r)
+
+    def vline(self, x, y, h, color):
+        b, r = self._bits[color]
+        self._fb_black.vline(x, y, h, b)
+        self._fb_red.vline(x, y, h, r)
+
+    def line(self, x0, y0, x1, y1, color):
+        b, r = self._bits[color]
+        self._fb_black.line(x0, y0, x1, y1, b)
+        self._fb_red.line(x0, y0, x1, y1, r)
+
+    def rect(self, x, y, w, h, color):
+        b, r = self._bits[color]
+        self._fb_black.rect(x, y, w, h, b)
+        self._fb_red.rect(x, y, w, h, r)
+
+    def fill_rect(self, x, y, w, h, color):
+        b, r = self._bits[color]
+        self._fb_black.fill_rect(x, y, w, h, b)
+        self._fb_red.fill_rect(x, y, w, h, r)
+
+    # framebuf's 8x8 font, the background is left as it is
+    def text(self, s, x, y, color):
+        b, r = self._bits[color]
+        self._fb_black.text(s, x, y, b)
+        self._fb_red.text(s, x, y, r)
+
+    # the colour at x, y, or None outside the canvas
+    def get_pixel(self, x, y):
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return None
+        on = self._bits[RED][1]
+        if self._fb_red.pixel(x, y) == on:
+            return RED
+        if self._fb_black.pixel(x, y) == on:
+            return BLACK
+        return WHITE
+
+    def display(self):
+        self.epd.display_frame(self.black, self.red)
+
+    async def display_async(self):
+        await self.epd.display_frame_async(self.black, self.red)
+
+    def start_refresh(self):
+        self.epd.start_refresh(self.black, self.red)